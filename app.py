@@ -1,14 +1,29 @@
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify, send_file
-import csv
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, send_file, g, Response, stream_with_context, make_response
 from datetime import datetime
-import requests
+import cProfile
+import hmac
+import math
 import os
+import time
+import click
 from dotenv import load_dotenv
-import win32com.client
-import pythoncom
-import pandas as pd
 from werkzeug.utils import secure_filename
-import shutil
+from user_directory import UserDirectory
+from credentials import CredentialStore, is_hashed
+from expense_report import ExpenseTemplate, XLSX_MIMETYPE
+from jobs import JobStore
+from distance_jobs import DistanceQueue, DISTANCE_PENDING, distance_state, escape_formula, unescape_formula
+from distance_estimator import DistanceEstimator, SiteMatrix, estimate_pairs, format_estimate
+from attendance_view import AttendanceView, LOCATIONS, iter_export_rows
+from trip_summary import TripSummary
+from attendance_anomalies import AnomalyScanner
+from storage import open_storage, import_csv, parse_distance_km, SqliteStorage, CsvStorage, ATTENDANCE_COLUMNS, TRIP_KINDS, TRIP_FIELDS
+from gazetteer import Gazetteer
+from geo_cache import GeoCache
+from kakao_client import KakaoClient, LOCAL_BASE_URL, NAVI_BASE_URL
+from metrics import Metrics
+from xlsx_stream import stream_xlsx
+from http_cache import FragmentCache, build_stamp, compress_response, make_etag, not_modified, set_validators
 
 load_dotenv()
 
@@ -26,91 +41,244 @@ app.config['PERMANENT_SESSION_LIFETIME'] = 600
 app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 
+TRIP_PAGE_SIZE = int(os.getenv('TRIP_PAGE_SIZE', 50))
+MAX_TRIP_PAGE_SIZE = 500
+ATTENDANCE_CHUNK_ROWS = int(os.getenv('ATTENDANCE_CHUNK_ROWS', 5000))
+# 이 크기(바이트) 이상인 HTML/JSON 응답은 gzip(brotli 설치 시 br)으로 압축
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))
+# 코드/템플릿 배포가 바뀌면 ETag 도 바뀌도록
+BUILD_STAMP = build_stamp([app.root_path, os.path.join(app.root_path, app.template_folder)])
+# 이 시간(초) 이상 '계산 중' 인 출장은 상태 조회 시 다시 계산 요청 (워커 재시작 등으로 유실된 작업 복구)
+DISTANCE_RETRY_SECONDS = int(os.getenv('DISTANCE_RETRY_SECONDS', 60))
+# api: Kakao 만 사용 / fallback: Kakao 경로 계산 실패 시 로컬 추정 / estimate: Kakao 호출 없이 로컬 추정만
+DISTANCE_MODE = os.getenv('DISTANCE_MODE', 'fallback')
+
+# 기본 내장 좌표 (GAZETTEER_PATH 파일 항목이 같은 이름이면 파일 우선)
 IC_COORDINATES = {
     "논산ic": {"x": "127.0896", "y": "36.2041"},
     "서울ic": {"x": "127.1045", "y": "37.5997"},
 }
 
+storage = open_storage(
+    os.getenv('STORAGE_BACKEND', 'csv'),
+    base_dir=os.getenv('DATA_DIR', '.'),
+    sqlite_path=os.getenv('SQLITE_PATH', 'total.db'),
+    fsync=os.getenv('CSV_FSYNC', '0') == '1',
+)
+user_directory = UserDirectory(storage)
+# 로그인 bcrypt 검증 스레드 수 제한, 실패 캐시/반복 실패 차단
+credentials = CredentialStore(
+    storage, user_directory,
+    workers=int(os.getenv('LOGIN_WORKERS', 4)),
+    rounds=int(os.getenv('BCRYPT_ROUNDS', 12)),
+    max_failures=int(os.getenv('LOGIN_MAX_FAILURES', 10)),
+    fail_window=int(os.getenv('LOGIN_FAIL_WINDOW', 60)),
+)
+attendance_view = AttendanceView(storage, user_directory)
+# 근태 화면의 (근무지, 부서)별 표 HTML
+attendance_fragments = FragmentCache(max_entries=int(os.getenv('ATTENDANCE_FRAGMENT_CACHE', 256)))
+trip_summary = TripSummary(storage, user_directory)
+# 정상 근무일 출근시간이 이 시각(HH:MM)보다 늦으면 지각으로 표시
+anomaly_scanner = AnomalyScanner(storage, user_directory, late_after=os.getenv('ATTENDANCE_LATE_AFTER', '09:00'))
+gazetteer = Gazetteer(os.getenv('GAZETTEER_PATH', 'gazetteer.csv'), builtin=IC_COORDINATES)
+expense_template = ExpenseTemplate(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'travel.xlsx'))
+export_jobs = JobStore(os.getenv('JOBS_DIR', 'jobs'), workers=int(os.getenv('EXPORT_WORKERS', 2)))
+geo_cache = GeoCache(
+    os.getenv('GEO_CACHE_PATH', 'geo_cache.db'),
+    ttl=int(os.getenv('GEO_CACHE_TTL', 30 * 24 * 3600)),
+    max_entries=int(os.getenv('GEO_CACHE_MAX_ENTRIES', 10000)),
+)
+estimator = DistanceEstimator(road_factor=float(os.getenv('ROAD_FACTOR', 1.2)))
+site_matrix = SiteMatrix(estimator, gazetteer.sites, measured=geo_cache.peek_distances)
+kakao = KakaoClient(
+    api_key,
+    local_base_url=os.getenv('KAKAO_LOCAL_BASE_URL', LOCAL_BASE_URL),
+    navi_base_url=os.getenv('KAKAO_NAVI_BASE_URL', NAVI_BASE_URL),
+    pool_size=int(os.getenv('KAKAO_POOL_SIZE', 10)),
+    max_retries=int(os.getenv('KAKAO_MAX_RETRIES', 2)),
+)
+
+# --- Metrics ---
+# /metrics 는 관리자 세션 또는 "Authorization: Bearer $METRICS_TOKEN" 으로 조회 (Prometheus 수집용)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+# 관리자가 "X-Profile: 1" 헤더로 요청하면 해당 요청을 cProfile 로 기록해 PROFILE_DIR 에 .prof 저장
+PROFILE_DIR = os.path.abspath(os.getenv('PROFILE_DIR', 'profiles'))
+
+metrics = Metrics()
+metrics.describe('http_request_duration_seconds', 'Flask request latency by route')
+metrics.describe('storage_seconds', 'Storage backend call latency by method')
+metrics.describe('kakao_request_seconds', 'Kakao API call latency (including retries)')
+metrics.describe('coordinate_lookups_total', 'Coordinate lookups by source')
+metrics.describe('distance_results_total', 'get_toll_distance results by source')
+metrics.instrument(storage, 'storage', [
+    'list_users', 'upsert_user', 'delete_user', 'add_trip', 'page_trips', 'find_trips', 'delete_trip',
+    'set_trip_distances', 'list_attendance', 'add_attendance', 'delete_attendance', 'compact_attendance',
+    'load_approvals', 'add_approvals', 'trip_summary',
+])
+metrics.instrument(kakao, 'kakao_request', ['geocode', 'directions'], label='api')
+metrics.instrument(expense_template, 'expense_report', ['render', 'render_batch'])
+
+def cache_metrics():
+    stats = geo_cache.stats()
+    rows = [('geo_cache_' + name, {}, value) for name, value in stats.items()]
+    for kind in ('coord', 'distance'):
+        lookups = stats[f'{kind}_hits'] + stats[f'{kind}_misses']
+        rows.append(('geo_cache_hit_ratio', {'cache': kind}, stats[f'{kind}_hits'] / lookups if lookups else 0))
+    return rows
+
+metrics.register_collector(cache_metrics)
+metrics.register_collector(lambda: [('login_results_total', {'result': k}, v) for k, v in credentials.stats.items()])
+metrics.register_collector(lambda: [('attendance_fragment_cache_' + k, {}, v) for k, v in attendance_fragments.stats.items()])
+
 # --- Helper Functions ---
 
 def get_coordinates(address):
     if not address or not address.strip():
         return None, None
     
-    address_lower = address.lower().replace(" ", "")
-    if address_lower in IC_COORDINATES:
-        return IC_COORDINATES[address_lower]["x"], IC_COORDINATES[address_lower]["y"]
-    
-    url = "https://dapi.kakao.com/v2/local/search/address.json"
-    headers = {"Authorization": f"KakaoAK {api_key}"}
-    params = {"query": address}
+    local = gazetteer.lookup(address)
+    if local:
+        metrics.inc('coordinate_lookups_total', source='gazetteer')
+        return local
+
+    cached = geo_cache.get_coordinates(address)
+    if cached:
+        metrics.inc('coordinate_lookups_total', source='cache')
+        return cached
     
-    try:
-        response = requests.get(url, headers=headers, params=params, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            if data["documents"]:
-                return data["documents"][0]["x"], data["documents"][0]["y"]
-    except Exception as e:
-        print(f"API Error: {e}")
-    return None, None
+    x, y = kakao.geocode(address)
+    if x and y:
+        geo_cache.set_coordinates(address, x, y)
+    metrics.inc('coordinate_lookups_total', source='kakao' if x and y else 'failed')
+    return x, y
+
+def local_coordinates(addresses):
+    # 네트워크 호출 없이 주소 사전 + 좌표 캐시에서 {정규화 주소: (x, y)}
+    found = geo_cache.peek_coordinates(addresses)
+    found.update(gazetteer.sites())
+    return found
+
+def estimate_distances(origins, destinations):
+    return estimate_pairs(origins, destinations, site_matrix, local_coordinates)
 
 def get_toll_distance(origin, destination):
-    origin_x, origin_y = get_coordinates(origin)
-    dest_x, dest_y = get_coordinates(destination)
+    cached = geo_cache.get_distance(origin, destination, "DISTANCE")
+    if cached is not None:
+        metrics.inc('distance_results_total', source='cache')
+        return f"{cached:.2f} km"
+
+    if DISTANCE_MODE == 'estimate':
+        estimate = estimate_distances([origin], [destination])[0]
+        metrics.inc('distance_results_total', source='failed' if math.isnan(estimate) else 'estimate')
+        return "주소 변환 실패" if math.isnan(estimate) else format_estimate(estimate)
+
+    (origin_x, origin_y), (dest_x, dest_y) = kakao.map(get_coordinates, [origin, destination])
     if not origin_x or not dest_x:
+        metrics.inc('distance_results_total', source='failed')
         return "주소 변환 실패"
-    
-    url = "https://apis-navi.kakaomobility.com/v1/directions"
-    headers = {"Authorization": f"KakaoAK {api_key}"}
-    params = {
-        "origin": f"{origin_x},{origin_y}",
-        "destination": f"{dest_x},{dest_y}",
-        "priority": "DISTANCE"
-    }
-    
-    try:
-        response = requests.get(url, headers=headers, params=params, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            distance = data["routes"][0]["summary"]["distance"] / 1000
-            return f"{distance:.2f} km"
-    except Exception:
-        pass
-    return "거리 계산 실패"
-
-def get_username_by_id(user_id):
-    try:
-        with open('users.csv', 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                if row[0] == user_id:
-                    return row[1]
-    except FileNotFoundError:
-        pass
-    return user_id
-
-def get_department_by_id(user_id):
-    try:
-        with open('users.csv', 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                if row[0] == user_id:
-                    return row[3]
-    except FileNotFoundError:
-        pass
-    return "미등록"
-
-def get_workplace_by_id(user_id):
-    try:
-        with open('users.csv', 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                if row[0] == user_id:
-                    return row[4] if row[4] in ['논산', '대전', '수원'] else '논산'
-    except FileNotFoundError:
-        pass
-    return '논산'
+
+    distance = kakao.directions((origin_x, origin_y), (dest_x, dest_y), "DISTANCE")
+    if distance is None:
+        if DISTANCE_MODE == 'fallback':
+            # 추정값은 캐시하지 않음 (다음 요청에서 실측 재시도)
+            estimate = site_matrix.distance(origin, destination)
+            if estimate is None:
+                estimate = estimator.estimate((origin_x, origin_y), (dest_x, dest_y))
+            metrics.inc('distance_results_total', source='estimate')
+            return format_estimate(estimate)
+        metrics.inc('distance_results_total', source='failed')
+        return "거리 계산 실패"
+    geo_cache.set_distance(origin, destination, distance, "DISTANCE")
+    metrics.inc('distance_results_total', source='kakao')
+    return f"{distance:.2f} km"
+
+distance_queue = DistanceQueue(storage, get_toll_distance, workers=int(os.getenv('DISTANCE_WORKERS', 4)))
+metrics.register_collector(lambda: [('distance_jobs_in_flight', {}, distance_queue.pending_count())])
+
+def submit_trip(kind, row):
+    # 거리 계산 전 상태로 먼저 저장하고 계산은 백그라운드로 넘김
+    row = row[:8] + [DISTANCE_PENDING]
+    storage.add_trip(kind, row)
+    distance_queue.submit(kind, row)
+
+def collect_trips(kind, user_id=None, start_date=None, end_date=None):
+    trips, cursor = [], None
+    while True:
+        page, cursor = storage.page_trips(kind, user_id=user_id, start_date=start_date, end_date=end_date, cursor=cursor, limit=1000)
+        trips.extend(page)
+        if not cursor:
+            return trips
+
+def data_etag(*kinds, extra=()):
+    # 화면이 의존하는 저장소 버전(users/trips/attendance) + 요청 경로/로그인 사용자 + 배포 버전
+    version = storage.data_version()
+    return make_etag(BUILD_STAMP, request.full_path, session.get('username'), session.get('realname'),
+                     *(version[kind] for kind in kinds), *extra)
+
+def attendance_tables():
+    # 근무지 → 부서 → 표 HTML: 마지막 렌더링 이후 바뀐 부서만 다시 렌더링
+    view, versions = attendance_view.sections()
+    tables = {}
+    for loc, depts in view.items():
+        tables[loc] = {}
+        for dept, records in depts.items():
+            tables[loc][dept] = attendance_fragments.get(
+                (loc, dept), versions.get((loc, dept)),
+                lambda: render_template('admin_attendance_table.html', loc=loc, dept=dept, records=records),
+            )
+    return tables
+
+def unchanged(etag):
+    # 클라이언트가 가진 버전(If-None-Match/If-Modified-Since)과 같으면 True → 화면을 다시 만들지 않고 304
+    g.data_modified = storage.data_modified()
+    return not_modified(request, etag, g.data_modified)
+
+def not_modified_response(etag):
+    return set_validators(Response(status=304), etag, g.get('data_modified'))
+
+def with_validators(response, etag):
+    return set_validators(make_response(response), etag, g.get('data_modified'))
+
+# --- Request hooks ---
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    g.profiler = None
+    if request.headers.get('X-Profile') == '1' and session.get('logged_in') and session.get('username') == 'admin':
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+@app.after_request
+def record_request_metrics(response):
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        name = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{request.endpoint or 'unknown'}_{os.getpid()}.prof"
+        profiler.dump_stats(os.path.join(PROFILE_DIR, name))
+        response.headers['X-Profile-File'] = name
+    start = g.pop('request_start', None)
+    if start is not None:
+        # 라우트 규칙 단위로 집계 (404 등 매칭 안 된 경로는 하나로)
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.observe('http_request_duration_seconds', time.perf_counter() - start,
+                        route=route, method=request.method, status=response.status_code)
+    return response
+
+@app.after_request
+def compress(response):
+    return compress_response(response, request.accept_encodings, min_size=COMPRESS_MIN_SIZE, level=COMPRESS_LEVEL)
+
+@app.route('/metrics')
+def metrics_endpoint():
+    authorized = (session.get('logged_in') and session.get('username') == 'admin') or (
+        METRICS_TOKEN and hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {METRICS_TOKEN}')
+    )
+    if not authorized:
+        return jsonify({'error': '권한이 없습니다.'}), 403
+    return Response(metrics.render(pid=os.getpid()), mimetype='text/plain; version=0.0.4')
 
 # --- Routes ---
 
@@ -125,22 +293,16 @@ def login():
     if request.method == 'POST':
         user_id = request.form.get('user_id')
         password = request.form.get('password')
-        try:
-            with open('users.csv', 'r', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    # [보안 Note] 실제 운영 시에는 hash 비교(check_password_hash) 사용 필수
-                    if row[0] == user_id and row[2] == password:
-                        session['logged_in'] = True
-                        session['username'] = user_id
-                        session['realname'] = row[1]
-                        session.permanent = False
-                        if user_id == 'admin':
-                            return redirect(url_for('admin_dashboard'))
-                        else:
-                            return redirect(url_for('index'))
-        except FileNotFoundError:
-            pass
+        user = credentials.verify(user_id, password, request.remote_addr)
+        if user:
+            session['logged_in'] = True
+            session['username'] = user_id
+            session['realname'] = user.username
+            session.permanent = False
+            if user_id == 'admin':
+                return redirect(url_for('admin_dashboard'))
+            else:
+                return redirect(url_for('index'))
         return render_template('login.html', error="로그인 실패")
     return render_template('login.html')
 
@@ -168,29 +330,17 @@ def local_trip():
         if not origin or not destination:
             error_message = "출발지와 목적지를 모두 입력해주세요."
         else:
-            distance = get_toll_distance(origin, destination)
-            if "실패" in distance:
-                error_message = distance
-            else:
-                with open('local_trips.csv', 'a', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    # [보안 4] CSV Injection 방지 (입력값 검증)
-                    safe_origin = "'" + origin if origin.startswith(('=', '+', '-', '@')) else origin
-                    safe_dest = "'" + destination if destination.startswith(('=', '+', '-', '@')) else destination
-                    writer.writerow([user_id, submit_time, trip_date, departure_time, safe_origin, car_number, purpose, safe_dest, distance])
-                return redirect(url_for('local_trip'))
-
-    try:
-        with open('local_trips.csv', 'r', encoding='utf-8') as f:
-            local_trips = [row for row in csv.reader(f) if row[0] == user_id]
-    except FileNotFoundError:
-        local_trips = []
+            # [보안 4] CSV Injection 방지 (입력값 검증)
+            safe_origin = escape_formula(origin)
+            safe_dest = escape_formula(destination)
+            submit_trip('local', [user_id, submit_time, trip_date, departure_time, safe_origin, car_number, purpose, safe_dest])
+            return redirect(url_for('local_trip'))
 
     filter_date = request.form.get('filter_date')
-    if filter_date:
-        local_trips = [trip for trip in local_trips if trip[2] == filter_date]
+    local_trips, next_cursor = storage.page_trips('local', user_id=user_id, start_date=filter_date, end_date=filter_date, limit=TRIP_PAGE_SIZE)
 
-    return render_template('local_trip.html', trips=local_trips, error_message=error_message)
+    return render_template('local_trip.html', trips=local_trips, next_cursor=next_cursor, error_message=error_message,
+                           distance_pending=DISTANCE_PENDING)
 
 @app.route('/outdoor_trip', methods=['GET', 'POST'])
 def outdoor_trip():
@@ -211,26 +361,14 @@ def outdoor_trip():
         if not origin or not destination:
             error_message = "출발지와 목적지를 모두 입력해주세요."
         else:
-            distance = get_toll_distance(origin, destination)
-            if "실패" in distance:
-                error_message = distance
-            else:
-                with open('outdoor_trips.csv', 'a', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    writer.writerow([user_id, submit_time, trip_date, departure_time, origin, car_number, purpose, destination, distance])
-                return redirect(url_for('outdoor_trip'))
-
-    try:
-        with open('outdoor_trips.csv', 'r', encoding='utf-8') as f:
-            outdoor_trips = [row for row in csv.reader(f) if row[0] == user_id]
-    except FileNotFoundError:
-        outdoor_trips = []
+            submit_trip('outdoor', [user_id, submit_time, trip_date, departure_time, origin, car_number, purpose, destination])
+            return redirect(url_for('outdoor_trip'))
 
     filter_date = request.form.get('filter_date')
-    if filter_date:
-        outdoor_trips = [trip for trip in outdoor_trips if trip[2] == filter_date]
+    outdoor_trips, next_cursor = storage.page_trips('outdoor', user_id=user_id, start_date=filter_date, end_date=filter_date, limit=TRIP_PAGE_SIZE)
 
-    return render_template('outdoor_trip.html', trips=outdoor_trips, error_message=error_message)
+    return render_template('outdoor_trip.html', trips=outdoor_trips, next_cursor=next_cursor, error_message=error_message,
+                           distance_pending=DISTANCE_PENDING)
 
 @app.route('/admin_dashboard')
 def admin_dashboard():
@@ -253,69 +391,137 @@ def admin_trips():
         email = request.form.get('email')
         register_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-        users = []
-        user_found = False
-        try:
-            with open('users.csv', 'r', encoding='utf-8') as f:
-                users = list(csv.reader(f))
-            for i, user in enumerate(users):
-                if user[0] == user_id:
-                    users[i] = [user_id, username, password, department, workplace, position, email, register_date]
-                    user_found = True
-                    break
-            if not user_found:
-                users.append([user_id, username, password, department, workplace, position, email, register_date])
-        except FileNotFoundError:
-            users = [[user_id, username, password, department, workplace, position, email, register_date]]
-
-        with open('users.csv', 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerows(users)
+        storage.upsert_user([user_id, username, credentials.hash(password), department, workplace, position, email, register_date])
+        user_directory.invalidate()
 
-    try:
-        with open('users.csv', 'r', encoding='utf-8') as f:
-            users = list(csv.reader(f))
-    except FileNotFoundError:
-        users = []
+    etag = data_etag('users', 'trips')
+    if request.method == 'GET' and unchanged(etag):
+        return not_modified_response(etag)
 
-    try:
-        with open('local_trips.csv', 'r', encoding='utf-8') as f:
-            local_trips = list(csv.reader(f))
-    except FileNotFoundError:
-        local_trips = []
+    users = user_directory.all()
 
-    try:
-        with open('outdoor_trips.csv', 'r', encoding='utf-8') as f:
-            outdoor_trips = list(csv.reader(f))
-    except FileNotFoundError:
-        outdoor_trips = []
+    local_trips, local_cursor = storage.page_trips('local', limit=TRIP_PAGE_SIZE)
+    outdoor_trips, outdoor_cursor = storage.page_trips('outdoor', limit=TRIP_PAGE_SIZE)
 
     local_trips_display = []
     for trip in local_trips:
-        username_val = get_username_by_id(trip[0])
+        username_val = user_directory.username(trip[0])
         local_trips_display.append([username_val, trip[1], trip[2], trip[3], trip[4], trip[7], trip[6], trip[5], trip[8]])
 
     outdoor_trips_display = []
     for trip in outdoor_trips:
-        username_val = get_username_by_id(trip[0])
+        username_val = user_directory.username(trip[0])
         outdoor_trips_display.append([username_val, trip[1], trip[2], trip[3], trip[4], trip[7], trip[6], trip[5], trip[8]])
 
-    return render_template('admin.html', users=users, local_trips=local_trips_display, outdoor_trips=outdoor_trips_display)
+    return with_validators(render_template('admin.html', users=users, local_trips=local_trips_display, outdoor_trips=outdoor_trips_display,
+                                           local_cursor=local_cursor, outdoor_cursor=outdoor_cursor), etag)
+
+@app.route('/admin/trip_summary')
+def admin_trip_summary():
+    if not session.get('logged_in') or session.get('username') != 'admin':
+        if request.args.get('format') == 'json':
+            return jsonify({'error': '권한이 없습니다.'}), 403
+        return redirect(url_for('admin_dashboard'))
+
+    months = trip_summary.months()
+    month = request.args.get('month') or (months[0] if months else datetime.now().strftime('%Y-%m'))
+    try:
+        datetime.strptime(month, '%Y-%m')
+    except ValueError:
+        return jsonify({'error': '월 형식이 올바르지 않습니다. (YYYY-MM)'}), 400
+    report = trip_summary.report(month)
+    if request.args.get('format') == 'json':
+        return jsonify({'month': month, **report})
+    return render_template('admin_trip_summary.html', month=month, months=months, report=report)
+
+@app.route('/admin/attendance_anomalies')
+def admin_attendance_anomalies():
+    if not session.get('logged_in') or session.get('username') != 'admin':
+        if request.args.get('format') == 'json':
+            return jsonify({'error': '권한이 없습니다.'}), 403
+        return redirect(url_for('admin_dashboard'))
+
+    months = anomaly_scanner.months()
+    month = request.args.get('month') or (months[0] if months else datetime.now().strftime('%Y-%m'))
+    try:
+        datetime.strptime(month, '%Y-%m')
+    except ValueError:
+        return jsonify({'error': '월 형식이 올바르지 않습니다. (YYYY-MM)'}), 400
+    anomalies, rescanned = anomaly_scanner.scan(month)
+    counts = {}
+    for row in anomalies:
+        counts[row['label']] = counts.get(row['label'], 0) + 1
+    if request.args.get('format') == 'json':
+        return jsonify({'month': month, 'counts': counts, 'rescanned': rescanned, 'anomalies': anomalies})
+    return render_template('admin_attendance_anomalies.html', month=month, months=months, counts=counts, anomalies=anomalies)
+
+@app.route('/api/trips/<kind>')
+def api_trips(kind):
+    if not session.get('logged_in'):
+        return jsonify({'error': '로그인이 필요합니다.'}), 401
+    if kind not in TRIP_KINDS:
+        return jsonify({'error': '잘못된 출장 구분입니다.'}), 404
+
+    # 관리자만 다른 사용자/전체 조회 가능
+    if session.get('username') == 'admin':
+        user_id = request.args.get('user_id') or None
+    else:
+        user_id = session.get('username')
+    try:
+        limit = max(1, min(int(request.args.get('limit', TRIP_PAGE_SIZE)), MAX_TRIP_PAGE_SIZE))
+    except ValueError:
+        limit = TRIP_PAGE_SIZE
+
+    trips, next_cursor = storage.page_trips(
+        kind,
+        user_id=user_id,
+        start_date=request.args.get('start_date') or None,
+        end_date=request.args.get('end_date') or None,
+        cursor=request.args.get('cursor') or None,
+        limit=limit,
+    )
+    return jsonify({
+        'trips': [dict(zip(TRIP_FIELDS, trip), username=user_directory.username(trip[0])) for trip in trips],
+        'next_cursor': next_cursor,
+    })
+
+@app.route('/api/trips/<kind>/distance')
+def api_trip_distance(kind):
+    # 신청 화면에서 '계산 중' 행의 거리를 폴링: ?submit_time=...&submit_time=...
+    if not session.get('logged_in'):
+        return jsonify({'error': '로그인이 필요합니다.'}), 401
+    if kind not in TRIP_KINDS:
+        return jsonify({'error': '잘못된 출장 구분입니다.'}), 404
+
+    submit_times = request.args.getlist('submit_time')[:MAX_TRIP_PAGE_SIZE]
+    now = datetime.now()
+    result = {}
+    for trip in storage.find_trips(kind, session.get('username'), submit_times):
+        state = distance_state(trip[8])
+        if state == 'pending' and not distance_queue.in_flight(kind, trip):
+            try:
+                age = (now - datetime.strptime(trip[1], '%Y-%m-%d %H:%M:%S')).total_seconds()
+            except ValueError:
+                age = DISTANCE_RETRY_SECONDS
+            if age >= DISTANCE_RETRY_SECONDS:
+                distance_queue.submit(kind, trip)
+        result[trip[1]] = {'state': state, 'distance': trip[8]}
+    return jsonify({'trips': result})
+
+@app.route('/api/places')
+def api_places():
+    # 출발지/도착지 입력 자동완성: 주소 사전 접두어 검색
+    if not session.get('logged_in'):
+        return jsonify({'error': '로그인이 필요합니다.'}), 401
+    return jsonify({'places': gazetteer.search(request.args.get('q', ''))})
 
 @app.route('/delete_user', methods=['POST'])
 def delete_user():
     if not session.get('logged_in') or session.get('username') != 'admin':
         return redirect(url_for('admin_dashboard'))
     user_id_to_delete = request.form.get('user_id')
-    try:
-        with open('users.csv', 'r', encoding='utf-8') as f:
-            users = list(csv.reader(f))
-        users = [user for user in users if user[0] != user_id_to_delete]
-        with open('users.csv', 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerows(users)
-    except FileNotFoundError:
-        pass
+    storage.delete_user(user_id_to_delete)
+    user_directory.invalidate()
     return redirect(url_for('admin_trips'))
 
 @app.route('/delete_local_trip', methods=['POST'])
@@ -324,15 +530,7 @@ def delete_local_trip():
         return redirect(url_for('admin_dashboard'))
 
     submit_time = request.form.get('submit_time')
-    try:
-        with open('local_trips.csv', 'r', encoding='utf-8') as f:
-            trips = list(csv.reader(f))
-        trips = [trip for trip in trips if trip[1] != submit_time]
-        with open('local_trips.csv', 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerows(trips)
-    except FileNotFoundError:
-        pass
+    storage.delete_trip('local', submit_time)
     return redirect(url_for('admin_trips'))
 
 @app.route('/delete_outdoor_trip', methods=['POST'])
@@ -341,15 +539,7 @@ def delete_outdoor_trip():
         return redirect(url_for('admin_dashboard'))
 
     submit_time = request.form.get('submit_time')
-    try:
-        with open('outdoor_trips.csv', 'r', encoding='utf-8') as f:
-            trips = list(csv.reader(f))
-        trips = [trip for trip in trips if trip[1] != submit_time]
-        with open('outdoor_trips.csv', 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerows(trips)
-    except FileNotFoundError:
-        pass
+    storage.delete_trip('outdoor', submit_time)
     return redirect(url_for('admin_trips'))
 
 @app.route('/admin_attendance', methods=['GET', 'POST'])
@@ -357,90 +547,27 @@ def admin_attendance():
     if not session.get('logged_in') or session.get('username') != 'admin':
         return redirect(url_for('admin_dashboard'))
 
-    attendance_data = []
-    try:
-        with open('attendance.csv', 'r', encoding='utf-8') as f:
-            attendance_data = list(csv.reader(f))
-    except FileNotFoundError:
-        pass
-
-    approvals = {}
-    try:
-        with open('approvals.csv', 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            next(reader) 
-            for row in reader:
-                approvals[(row[0], str(row[1]))] = row[2]
-    except FileNotFoundError:
-        pass
-    except StopIteration:
-        pass
+    etag = data_etag('users', 'attendance')
+    if request.method == 'GET' and unchanged(etag):
+        return not_modified_response(etag)
 
     if request.method == 'POST' and 'file' in request.files:
         file = request.files['file']
         if file and file.filename.endswith('.xlsx'):
-            df = pd.read_excel(file, engine='openpyxl')
-            expected_columns = ['발생일자', '발생시각', '일시', '사원번호', '이름', '모드']
-            # [보안 5] 컬럼 유효성 검사 강화
-            if not all(col in df.columns for col in expected_columns):
-                return jsonify({'error': '엑셀 형식이 올바르지 않습니다. 필요한 컬럼: ' + ', '.join(expected_columns)})
-            
-            existing_df = pd.DataFrame(attendance_data[1:], columns=attendance_data[0]) if attendance_data else pd.DataFrame(columns=['사원번호', '이름', '부서', '출근시간', '퇴근시간', '날짜', '결재상태', '근무지', '비고'])
-            existing_keys = set(zip(existing_df['사원번호'], existing_df['날짜'].astype(str)))
-            
-            df['날짜'] = df['발생일자'].astype(str) + ' ' + df['발생시각'].astype(str)
-            attendance_by_date = {}
-            for date in df['발생일자'].unique():
-                date_df = df[df['발생일자'] == date]
-                attendance = date_df[date_df['모드'].isin(['출근', '퇴근'])].copy()
-                attendance['부서'] = attendance['사원번호'].apply(get_department_by_id)
-                attendance_grouped = attendance.groupby('사원번호').agg({
-                    '이름': 'first', '부서': 'first', '날짜': list, '모드': 'first'
-                }).reset_index()
-                
-                attendance_processed = []
-                for _, row in attendance_grouped.iterrows():
-                    key = (row['사원번호'], str(row['날짜'][0]) if row['날짜'] else None)
-                    if key not in existing_keys:
-                        dates = row['날짜']
-                        출근시간 = next((d for d in dates if '출근' in attendance[attendance['날짜'] == d]['모드'].values), None)
-                        퇴근시간 = next((d for d in dates if '퇴근' in attendance[attendance['날짜'] == d]['모드'].values), None)
-                        workplace = get_workplace_by_id(row['사원번호'])
-                        
-                        mode = row['모드'].lower()
-                        remark = '정상'
-                        if '출장' in mode:
-                            if '시내' in mode: remark = '출(시내)'
-                            elif '시외' in mode: remark = '출(시외)'
-                        elif '연차' in mode: remark = '연차'
-                        elif '반차' in mode: remark = '반차'
-                        elif '휴직' in mode: remark = '휴직'
-                        elif '육아' in mode: remark = '육아'
-                        
-                        attendance_processed.append({
-                            '사원번호': row['사원번호'],
-                            '이름': row['이름'],
-                            '부서': row['부서'],
-                            '출근시간': 출근시간,
-                            '퇴근시간': 퇴근시간,
-                            '날짜': row['날짜'][0] if row['날짜'] else None,
-                            '결재상태': '대기',
-                            '근무지': workplace,
-                            '비고': remark
-                        })
-                if attendance_processed:
-                    attendance_by_date[date] = pd.DataFrame(attendance_processed)
-            
-            if attendance_by_date:
-                df_processed = pd.concat(attendance_by_date.values(), ignore_index=True)
-                if not existing_df.empty:
-                    df_processed = pd.concat([existing_df, df_processed], ignore_index=True)
-                df_processed.to_csv('attendance.csv', index=False, encoding='utf-8')
-            
-            if not os.path.exists('approvals.csv'):
-                with open('approvals.csv', 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(['사원번호', '날짜', '상태'])
+            # pandas/openpyxl 은 업로드/일괄 승인에서만 필요하므로 이때 불러옴 (워커 기동 시간 단축)
+            from attendance import InvalidSheetError, read_punch_chunks, process_punch_chunks, to_records
+            try:
+                # [보안 5] 컬럼 유효성 검사 강화 (헤더 행에서 검증 후 청크 단위 처리)
+                chunks = read_punch_chunks(file.stream, ATTENDANCE_CHUNK_ROWS)
+                with metrics.timer('attendance_upload_processing'):
+                    df_processed = process_punch_chunks(chunks, user_directory.all())
+            except InvalidSheetError as e:
+                return jsonify({'error': str(e)})
+            if not df_processed.empty:
+                records = to_records(df_processed)
+                before = attendance_view.version()
+                storage.add_attendance(records)
+                attendance_view.apply_upload(before, records)
             return jsonify({'success': True})
         return jsonify({'error': '유효한 엑셀 파일을 업로드해주세요.'})
 
@@ -448,117 +575,98 @@ def admin_attendance():
         employee_id = request.form.get('employee_id')
         date = request.form.get('date')
         try:
-            with open('attendance.csv', 'r', encoding='utf-8') as f:
-                attendance_data = list(csv.reader(f))
-            if attendance_data:
-                headers = attendance_data[0]
-                data = attendance_data[1:]
-                updated_data = [headers]
-                for row in data:
-                    if not (row[headers.index('사원번호')] == employee_id and row[headers.index('날짜')] == date):
-                        updated_data.append(row)
-                with open('attendance.csv', 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    writer.writerows(updated_data)
-                
-                with open('approvals.csv', 'r', encoding='utf-8') as f:
-                    approvals_data = list(csv.reader(f))
-                if approvals_data:
-                    headers = approvals_data[0]
-                    data = approvals_data[1:]
-                    updated_approvals = [headers]
-                    for row in data:
-                        if not (row[headers.index('사원번호')] == employee_id and row[headers.index('날짜')] == date):
-                            updated_approvals.append(row)
-                    with open('approvals.csv', 'w', newline='', encoding='utf-8') as f:
-                        writer = csv.writer(f)
-                        writer.writerows(updated_approvals)
+            before = attendance_view.version()
+            storage.delete_attendance(employee_id, date)
+            attendance_view.apply_delete(before, employee_id, date)
             return redirect(url_for('admin_attendance'))
         except Exception as e:
             return jsonify({'error': '데이터 삭제 실패'}), 500
 
-    df = pd.DataFrame(attendance_data[1:], columns=attendance_data[0]) if attendance_data else pd.DataFrame()
-    
-    if not df.empty and '사원번호' in df.columns:
-        if '근무지' not in df.columns: 
-            df['근무지'] = df['사원번호'].apply(get_workplace_by_id)
-            
-    if '결재상태' not in df.columns: df['결재상태'] = '대기'
-    if '비고' not in df.columns: df['비고'] = '정상'
-    
-    locations = ['논산', '대전', '수원']
-    attendance_by_loc = {}
-    for loc in locations:
-        loc_df = df[df['근무지'] == loc] if not df.empty else pd.DataFrame()
-        departments = loc_df['부서'].unique().tolist() if '부서' in loc_df.columns else []
-        attendance_by_loc[loc] = {}
-        for dept in departments:
-            dept_df = loc_df[loc_df['부서'] == dept]
-            records = dept_df.to_dict('records')
-            for record in records:
-                key = (record['사원번호'], str(record['날짜']))
-                record['결재상태'] = approvals.get(key, record['결재상태'])
-            attendance_by_loc[loc][dept] = records
-
     if request.method == 'POST' and request.form.get('action') == 'approve_all':
         loc = request.form.get('loc')
         dept = request.form.get('dept')
-        with open('attendance.csv', 'r', encoding='utf-8') as f:
-            attendance_data = list(csv.reader(f))
-        df = pd.DataFrame(attendance_data[1:], columns=attendance_data[0])
-        if loc and dept and '부서' in df.columns:
-            df = df[df['부서'] == dept]
-        for index, row in df.iterrows():
-            key = (row['사원번호'], str(row['날짜']))
-            if key not in approvals or approvals.get(key) == '대기':
-                with open('approvals.csv', 'a', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    writer.writerow([row['사원번호'], row['날짜'], '승인'])
-                approvals[key] = '승인'
+        start_date = request.form.get('start_date') or None
+        end_date = request.form.get('end_date') or None
+        for value in (start_date, end_date):
+            if value:
+                try:
+                    datetime.strptime(value, '%Y-%m-%d')
+                except ValueError:
+                    return jsonify({'error': '날짜 형식이 올바르지 않습니다. (YYYY-MM-DD)'}), 400
+        from attendance import pending_approvals
+        # 대상 키를 한 번에 계산해 단일 append/트랜잭션으로 기록
+        before = attendance_view.version()
+        keys = pending_approvals(
+            storage.list_attendance(), storage.load_approvals(),
+            workplace=loc, department=dept, start_date=start_date, end_date=end_date,
+        )
+        if keys:
+            storage.add_approvals([(employee_id, date, '승인') for employee_id, date in keys])
+            attendance_view.apply_approvals(before, keys)
         return redirect(url_for('admin_attendance'))
 
     if request.method == 'POST' and 'action' in request.form and request.form['action'] == 'approve':
         employee_id = request.form.get('employee_id')
         date = request.form.get('date')
         key = (employee_id, str(date))
+        approvals = storage.load_approvals()
         if key not in approvals or approvals.get(key) == '대기':
-            with open('approvals.csv', 'a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([employee_id, date, '승인'])
-            approvals[key] = '승인'
+            before = attendance_view.version()
+            storage.add_approvals([(employee_id, date, '승인')])
+            attendance_view.apply_approvals(before, [key])
         return redirect(url_for('admin_attendance'))
 
     if request.method == 'POST' and request.form.get('action') == 'delete_all':
        
         return redirect(url_for('admin_attendance'))
 
-    return render_template('admin_attendance.html', attendance_by_loc=attendance_by_loc, locations=locations)
+    return with_validators(render_template('admin_attendance.html', attendance_tables=attendance_tables(), locations=LOCATIONS), etag)
 
 @app.route('/generate_attendance_excel', methods=['GET'])
 def generate_attendance_excel():
     if not session.get('logged_in') or session.get('username') != 'admin':
         return redirect(url_for('admin_dashboard'))
-    
-    try:
 
-        with open('attendance.csv', 'r', encoding='utf-8') as f:
-            attendance_data = list(csv.reader(f))
-        
-        df = pd.DataFrame(attendance_data[1:], columns=attendance_data[0])
-        
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        save_folder = os.path.join(base_dir, 'downloads')
-        if not os.path.exists(save_folder): os.makedirs(save_folder)
-        
-        filename = f'approved_attendance_{datetime.now().strftime("%Y%m%d")}.xlsx'
-        output_path = os.path.join(save_folder, filename)
-        
-        df.to_excel(output_path, index=False)
-        
-        return send_file(output_path, as_attachment=True, download_name=filename)
+    loc = request.args.get('loc') or None
+    dept = request.args.get('dept') or None
+    month = request.args.get('month') or None
+    # 기본은 승인된 레코드만, status=all 이면 결재상태 무관
+    status = request.args.get('status', '승인')
+    status = None if status == 'all' else status
+    if month:
+        try:
+            datetime.strptime(month, '%Y-%m')
+        except ValueError:
+            return jsonify({'error': '월 형식이 올바르지 않습니다. (YYYY-MM)'}), 400
+
+    # 월 미지정 시 파일명에 오늘 날짜가 들어가므로 날짜도 ETag 에 포함
+    etag = data_etag('users', 'attendance', extra=(datetime.now().strftime('%Y%m%d'),))
+    if unchanged(etag):
+        return not_modified_response(etag)
+
+    try:
+        rows = iter_export_rows(
+            storage.iter_attendance(), storage.load_approvals(), workplace_of=user_directory.workplace,
+            workplace=loc, department=dept, month=month, status=status,
+        )
+        chunks = stream_xlsx(ATTENDANCE_COLUMNS, rows, sheet_name='근태')
+        # 첫 청크까지는 여기서 만들어 읽기 오류를 응답 전에 처리 (이후는 행을 읽는 대로 전송, 디스크에 남기지 않음)
+        first = next(chunks)
     except Exception as e:
         return render_template('admin_attendance.html', error=f"엑셀 생성 오류: {str(e)}")
 
+    prefix = 'approved_attendance' if status == '승인' else 'attendance'
+    filename = f'{prefix}_{month.replace("-", "") if month else datetime.now().strftime("%Y%m%d")}.xlsx'
+
+    def generate():
+        yield first
+        yield from chunks
+
+    return with_validators(Response(
+        stream_with_context(generate()), mimetype=XLSX_MIMETYPE,
+        headers={'Content-Disposition': f'attachment; filename={filename}'},
+    ), etag)
+
 @app.route('/expense_claim')
 def expense_claim():
     if not session.get('logged_in'):
@@ -584,65 +692,200 @@ def generate_expense_excel():
         return redirect(url_for('login'))
 
     try:
-        pythoncom.CoInitialize()
         data = request.form
-        
+
         safe_username = secure_filename(session.get('username'))
         trip_date = secure_filename(data.get('trip_date', ''))
-        
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        template_path = os.path.join(base_dir, 'travel.xlsx')
-        save_folder = os.path.join(base_dir, 'downloads')
-        
-        if not os.path.exists(save_folder):
-            os.makedirs(save_folder)
-            
         filename = f"expense_report_{safe_username}_{trip_date}.xlsx"
-        save_path = os.path.join(save_folder, filename)
 
-        if not os.path.exists(template_path):
+        if not expense_template.exists():
             return "Error: 'travel.xlsx' template not found in project folder.", 500
 
-        shutil.copy(template_path, save_path)
-
-        excel = win32com.client.Dispatch("Excel.Application")
-        excel.Visible = False
-        excel.DisplayAlerts = False
-
-        try:
-            wb = excel.Workbooks.Open(save_path)
-            ws = wb.ActiveSheet
-            
-            ws.Range('C10').Value = data.get('trip_date')
-            ws.Range('C11').Value = data.get('location')
-            ws.Range('C12').Value = "차량"
-            ws.Range('C13').Value = data.get('car_number')
-            ws.Range('B17').Value = data.get('purpose')
-            ws.Range('C28').Value = data.get('origin')
-            ws.Range('E28').Value = data.get('destination')
-            
-            try: toll = float(data.get('toll_fee', '0').replace(',', ''))
-            except: toll = 0
-            ws.Range('G28').Value = toll
-
-            distance_str = get_toll_distance(data.get('origin'), data.get('destination'))
-            try: dist = float(distance_str.replace(' km', ''))
-            except: dist = 0
-            ws.Range('I28').Value = dist
-
-            wb.Save()
-            wb.Close()
-        except Exception as e:
-            raise e
-        finally:
-            excel.Quit()
-
-        return send_file(save_path, as_attachment=True, download_name=filename)
+        try: toll = float(data.get('toll_fee', '0').replace(',', ''))
+        except: toll = 0
+
+        distance_str = get_toll_distance(data.get('origin'), data.get('destination'))
+        dist = parse_distance_km(distance_str)
+
+        output = expense_template.render({
+            'trip_date': data.get('trip_date'),
+            'location': data.get('location'),
+            'transport': "차량",
+            'car_number': data.get('car_number'),
+            'purpose': data.get('purpose'),
+            'origin': data.get('origin'),
+            'destination': data.get('destination'),
+            'toll_fee': toll,
+            'distance': dist,
+        })
+        return send_file(output, as_attachment=True, download_name=filename, mimetype=XLSX_MIMETYPE)
 
     except Exception as e:
         return f"Error: {str(e)}", 500
-    finally:
-        pythoncom.CoUninitialize()
+
+@app.route('/expense_batch', methods=['POST'])
+def expense_batch():
+    if not session.get('logged_in') or session.get('username') != 'admin':
+        return jsonify({'error': '관리자만 사용할 수 있습니다.'}), 403
+
+    kind = request.form.get('kind', 'all')
+    layout = request.form.get('layout', 'employee')
+    if kind not in TRIP_KINDS + ('all',) or layout not in ('employee', 'trip'):
+        return jsonify({'error': '잘못된 요청입니다.'}), 400
+    if not expense_template.exists():
+        return jsonify({'error': "'travel.xlsx' template not found in project folder."}), 500
+
+    trips_by_user, skipped = {}, []
+    for k in (TRIP_KINDS if kind == 'all' else (kind,)):
+        trips = collect_trips(
+            k,
+            user_id=request.form.get('user_id') or None,
+            start_date=request.form.get('start_date') or None,
+            end_date=request.form.get('end_date') or None,
+        )
+        for trip in trips:
+            # 거리 계산 중/실패 행은 0 km 로 정산되지 않도록 제외하고 작업 결과에 목록으로 남김
+            if distance_state(trip[8]) != 'done':
+                skipped.append(trip)
+                continue
+            trips_by_user.setdefault(trip[0], []).append(trip)
+    if not trips_by_user:
+        if skipped:
+            return jsonify({'error': f'거리가 확정되지 않은 출장만 있습니다. ({len(skipped)}건: 계산 중/실패)'})
+        return jsonify({'error': '해당 조건의 출장 내역이 없습니다.'})
+    for trips in trips_by_user.values():
+        trips.sort(key=lambda t: (t[2], t[1]))
+    skipped.sort(key=lambda t: (t[0], t[2], t[1]))
+
+    job_id = export_jobs.submit(expense_template.render_batch, trips_by_user, layout, skipped)
+    return jsonify({'job_id': job_id, 'status_url': url_for('expense_batch_status', job_id=job_id)})
+
+@app.route('/expense_batch/<job_id>')
+def expense_batch_status(job_id):
+    if not session.get('logged_in') or session.get('username') != 'admin':
+        return jsonify({'error': '관리자만 사용할 수 있습니다.'}), 403
+    status = export_jobs.status(job_id)
+    if status is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+    if status['state'] == 'done':
+        status['download_url'] = url_for('expense_batch_download', job_id=job_id)
+    return jsonify(status)
+
+@app.route('/expense_batch/<job_id>/download')
+def expense_batch_download(job_id):
+    if not session.get('logged_in') or session.get('username') != 'admin':
+        return redirect(url_for('admin_dashboard'))
+    status = export_jobs.status(job_id)
+    if status is None or status['state'] != 'done':
+        return "Error: export not ready.", 404
+    filename = f"expense_reports_{datetime.fromtimestamp(status['created']).strftime('%Y%m%d_%H%M%S')}.zip"
+    return send_file(export_jobs.result_path(job_id), as_attachment=True, download_name=filename, mimetype='application/zip')
+
+@app.route('/admin/gazetteer', methods=['POST'])
+def import_gazetteer():
+    if not session.get('logged_in') or session.get('username') != 'admin':
+        return jsonify({'error': '관리자만 사용할 수 있습니다.'}), 403
+    file = request.files.get('file')
+    if not file or not file.filename.lower().endswith('.csv'):
+        return jsonify({'error': '유효한 CSV 파일을 업로드해주세요.'}), 400
+    try:
+        result = gazetteer.import_csv(file.read(), replace=request.form.get('replace') == '1')
+    except (ValueError, UnicodeDecodeError) as e:
+        return jsonify({'error': str(e) if isinstance(e, ValueError) else 'UTF-8 CSV 파일만 지원합니다.'}), 400
+    return jsonify(result)
+
+@app.cli.command('compact-attendance')
+def compact_attendance_command():
+    # 근태 tombstone 을 반영해 attendance.csv / approvals.csv 재작성
+    storage.compact_attendance()
+    print("compacted")
+
+@app.cli.command('rebuild-trip-summary')
+def rebuild_trip_summary_command():
+    # 월별 출장 합계를 출장 데이터 전체에서 다시 계산
+    storage.rebuild_trip_summary()
+    print(f"summary rows: {len(storage.trip_summary())}")
+
+@app.cli.command('import-csv')
+def import_csv_command():
+    # CSV 데이터를 SQLITE_PATH 의 SQLite DB 로 1회 이관
+    target = SqliteStorage(os.getenv('SQLITE_PATH', 'total.db'))
+    counts = import_csv(CsvStorage(os.getenv('DATA_DIR', '.')), target)
+    for name, count in counts.items():
+        print(f"{name}: {count}")
+
+@app.cli.command('import-gazetteer')
+@click.argument('path')
+@click.option('--replace', is_flag=True, help='기존 항목을 모두 교체')
+def import_gazetteer_command(path, replace):
+    # name,x,y[,aliases] CSV 를 GAZETTEER_PATH 주소 사전에 병합
+    with open(path, 'rb') as f:
+        result = gazetteer.import_csv(f.read(), replace=replace)
+    for name, count in result.items():
+        print(f"{name}: {count}")
+
+@app.cli.command('hash-passwords')
+def hash_passwords_command():
+    # 평문으로 남아 있는 비밀번호를 bcrypt 해시로 일괄 변환 (로그인 시에도 사용자별로 변환됨)
+    users = [user for user in user_directory.all() if user.password and not is_hashed(user.password)]
+    for user, hashed in zip(users, credentials.hash_many([user.password for user in users])):
+        storage.upsert_user([user.user_id, user.username, hashed] + list(user[3:]))
+    user_directory.invalidate()
+    print(f"hashed: {len(users)}")
+
+@app.cli.command('estimate-trip-distances')
+@click.option('--kind', type=click.Choice(['all'] + list(TRIP_KINDS)), default='all')
+@click.option('--start-date', default=None, help='출장일 시작 (YYYY-MM-DD)')
+@click.option('--end-date', default=None, help='출장일 종료 (YYYY-MM-DD)')
+@click.option('--all', 'all_trips', is_flag=True, help='실패 건뿐 아니라 계산된 출장도 모두 다시 추정')
+@click.option('--dry-run', is_flag=True)
+def estimate_trip_distances_command(kind, start_date, end_date, all_trips, dry_run):
+    # Kakao 호출 없이 로컬 거리 추정으로 과거 출장 일괄 재산정 (좌표를 모르는 출장은 건너뜀)
+    start = time.perf_counter()
+    total = updated = 0
+    for k in (TRIP_KINDS if kind == 'all' else (kind,)):
+        trips = [
+            trip for trip in collect_trips(k, start_date=start_date, end_date=end_date)
+            if distance_state(trip[8]) == 'failed' or (all_trips and distance_state(trip[8]) == 'done')
+        ]
+        km = estimate_distances([unescape_formula(t[4]) for t in trips], [unescape_formula(t[7]) for t in trips])
+        updates = [(trip, format_estimate(d)) for trip, d in zip(trips, km) if not math.isnan(d)]
+        total += len(trips)
+        updated += len(updates) if dry_run else storage.set_trip_distances(k, updates)
+        print(f"{k}: {len(updates)}/{len(trips)} estimated")
+    elapsed = time.perf_counter() - start
+    print(f"{'would update' if dry_run else 'updated'} {updated}, skipped {total - updated} (no local coordinates), "
+          f"{total / elapsed if elapsed > 0 else 0:.0f} trips/sec")
+
+@app.cli.command('import-trips')
+@click.argument('path')
+@click.option('--kind', type=click.Choice(list(TRIP_KINDS)), default=None, help='파일에 구분(시내/시외) 열이 없을 때 사용할 구분')
+@click.option('--workers', default=int(os.getenv('IMPORT_WORKERS', 8)), show_default=True, help='거리 계산 동시 실행 수')
+@click.option('--rate', default=float(os.getenv('IMPORT_RATE', 10)), show_default=True, help='초당 최대 거리 계산 수 (0 이면 제한 없음)')
+@click.option('--checkpoint', default=None, help='계산 결과 체크포인트 파일 (기본값: PATH.checkpoint.jsonl)')
+@click.option('--reprice', is_flag=True, help='파일의 거리를 무시하고 다시 계산 (이미 가져온 출장도 거리 갱신)')
+@click.option('--dry-run', is_flag=True)
+def import_trips_command(path, kind, workers, rate, checkpoint, reprice, dry_run):
+    # 과거 출장 CSV/XLSX 일괄 가져오기: 출발지/목적지 쌍별로 한 번만 get_toll_distance 호출 후 구분별 일괄 저장.
+    # 중단되면 같은 명령을 다시 실행 (계산된 쌍은 체크포인트에서, 저장된 행은 중복으로 건너뜀)
+    from trip_import import Checkpoint, import_trips, parse_trips, read_rows
+    start = time.perf_counter()
+    trips, errors = parse_trips(read_rows(path), kind=kind)
+    for line, message in errors[:20]:
+        print(f"line {line}: {message}")
+    if len(errors) > 20:
+        print(f"... {len(errors) - 20} more errors")
+    stats = import_trips(
+        storage, trips, get_toll_distance, workers=workers, rate=rate, reprice=reprice, dry_run=dry_run,
+        checkpoint=Checkpoint(checkpoint or f'{path}.checkpoint.jsonl'),
+    )
+    elapsed = time.perf_counter() - start
+    for name, count in stats.items():
+        print(f"{name}: {count}")
+    print(f"invalid: {len(errors)}")
+    written = sum(stats.get(f'{k}_written', 0) for k in TRIP_KINDS)
+    print(f"{'parsed' if dry_run else 'imported'} {len(trips) if dry_run else written} trips in {elapsed:.1f}s, "
+          f"{(len(trips) if dry_run else written) / elapsed if elapsed > 0 else 0:.0f} trips/sec")
 
 if __name__ == '__main__':
     
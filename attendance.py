@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from storage import ATTENDANCE_COLUMNS
+from user_directory import WORKPLACES
+
+EXPECTED_COLUMNS = ['발생일자', '발생시각', '일시', '사원번호', '이름', '모드']
+
+# 모드 문자열 → 비고 (위에서부터 우선 적용)
+REMARK_RULES = [
+    (('출장', '시내'), '출(시내)'),
+    (('출장', '시외'), '출(시외)'),
+    (('출장',), '정상'),
+    (('연차',), '연차'),
+    (('반차',), '반차'),
+    (('휴직',), '휴직'),
+    (('육아',), '육아'),
+]
+
+
+def user_maps(users):
+    departments = {}
+    workplaces = {}
+    for user in users:
+        # 중복 ID 는 첫 번째 행 우선
+        if user.user_id not in departments:
+            departments[user.user_id] = user.department
+            workplaces[user.user_id] = user.workplace if user.workplace in WORKPLACES else '논산'
+    return departments, workplaces
+
+
+def _remarks(modes):
+    modes = modes.astype(str).str.lower()
+    conditions = []
+    for words, _ in REMARK_RULES:
+        cond = np.ones(len(modes), dtype=bool)
+        for word in words:
+            cond &= modes.str.contains(word, regex=False).to_numpy()
+        conditions.append(cond)
+    return np.select(conditions, [remark for _, remark in REMARK_RULES], default='정상')
+
+
+class InvalidSheetError(ValueError):
+    pass
+
+
+SUMMARY_KEYS = ['발생일자', '사원번호']
+
+
+def summarize_punches(df):
+    # 출퇴근 기록(1행 = 1회 태그)을 (일자, 사원) 단위로 집계한 중간 결과
+    punches = df.loc[df['모드'].isin(['출근', '퇴근']), ['발생일자', '발생시각', '사원번호', '이름', '모드']]
+    punches = punches.assign(
+        발생일자=punches['발생일자'].astype(str),
+        사원번호=punches['사원번호'].astype(str),
+        날짜=punches['발생일자'].astype(str) + ' ' + punches['발생시각'].astype(str),
+    )
+    summary = punches.groupby(SUMMARY_KEYS, sort=False).agg(
+        이름=('이름', 'first'), 날짜=('날짜', 'first'), 모드=('모드', 'first'),
+    )
+    times = (
+        punches.groupby(SUMMARY_KEYS + ['모드'], sort=False)['날짜'].first()
+        .unstack('모드')
+        .reindex(columns=['출근', '퇴근'])
+    )
+    return summary.join(times)
+
+
+def merge_summaries(summaries):
+    # 앞선 청크의 값이 우선 (first 는 결측값을 건너뜀)
+    return pd.concat(summaries).groupby(level=SUMMARY_KEYS, sort=False).first()
+
+
+def finalize_summary(summary, users, existing_keys=None):
+    summary = summary.reset_index()
+    if summary.empty:
+        return pd.DataFrame(columns=ATTENDANCE_COLUMNS)
+
+    if existing_keys:
+        key_index = pd.MultiIndex.from_arrays([summary['사원번호'], summary['날짜']])
+        summary = summary[~key_index.isin(list(existing_keys))]
+
+    departments, workplaces = user_maps(users)
+    result = pd.DataFrame({
+        '사원번호': summary['사원번호'],
+        '이름': summary['이름'],
+        '부서': summary['사원번호'].map(departments).fillna('미등록'),
+        '출근시간': summary['출근'],
+        '퇴근시간': summary['퇴근'],
+        '날짜': summary['날짜'],
+        '결재상태': '대기',
+        '근무지': summary['사원번호'].map(workplaces).fillna('논산'),
+        '비고': _remarks(summary['모드']),
+    })
+    return result.reset_index(drop=True)
+
+
+def process_punches(df, users, existing_keys=None):
+    return finalize_summary(summarize_punches(df), users, existing_keys)
+
+
+def process_punch_chunks(chunks, users, existing_keys=None):
+    # 청크마다 집계 후 누적 요약과 병합: 메모리는 (일자, 사원) 수에만 비례
+    summary = None
+    for chunk in chunks:
+        part = summarize_punches(chunk)
+        summary = part if summary is None else merge_summaries([summary, part])
+    if summary is None:
+        return pd.DataFrame(columns=ATTENDANCE_COLUMNS)
+    return finalize_summary(summary, users, existing_keys)
+
+
+def read_punch_chunks(file, chunk_rows=5000):
+    # openpyxl read-only 모드로 시트를 행 단위 스트리밍 (통합문서 전체를 메모리에 올리지 않음)
+    wb = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = ['' if cell is None else str(cell).strip() for cell in next(rows, ())]
+        if not all(col in header for col in EXPECTED_COLUMNS):
+            raise InvalidSheetError('엑셀 형식이 올바르지 않습니다. 필요한 컬럼: ' + ', '.join(EXPECTED_COLUMNS))
+        indexes = [header.index(col) for col in EXPECTED_COLUMNS]
+
+        chunk = []
+        for row in rows:
+            if not any(cell is not None for cell in row):
+                continue
+            chunk.append([row[i] if i < len(row) else None for i in indexes])
+            if len(chunk) >= chunk_rows:
+                yield pd.DataFrame(chunk, columns=EXPECTED_COLUMNS)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=EXPECTED_COLUMNS)
+    finally:
+        wb.close()
+
+
+def pending_approvals(records, approvals, workplace=None, department=None, start_date=None, end_date=None):
+    # 조건에 맞는 미승인(미결재 또는 '대기') 키 목록. 날짜 범위는 '날짜' 앞 10자리(YYYY-MM-DD) 기준
+    df = pd.DataFrame(records, columns=ATTENDANCE_COLUMNS)
+    if df.empty:
+        return []
+    keys = pd.MultiIndex.from_arrays([df['사원번호'].astype(str), df['날짜'].astype(str)])
+    mask = np.ones(len(df), dtype=bool)
+    if workplace:
+        mask &= (df['근무지'] == workplace).to_numpy()
+    if department:
+        mask &= (df['부서'] == department).to_numpy()
+    days = keys.get_level_values(1).str[:10]
+    if start_date:
+        mask &= days >= start_date
+    if end_date:
+        mask &= days <= end_date
+    decided = [key for key, status in approvals.items() if status != '대기']
+    if decided:
+        mask &= ~keys.isin(decided)
+    return list(dict.fromkeys(keys[mask]))
+
+
+def to_records(df):
+    return df.astype(object).where(df.notna(), None).to_dict('records')
@@ -0,0 +1,179 @@
+import threading
+
+from storage import ATTENDANCE_COLUMNS, TRIP_FIELDS
+
+# 출근/퇴근이 없어도 정상인 비고 (휴가/휴직 중 출장은 별도로 표시)
+LEAVE_REMARKS = ('연차', '휴직', '육아')
+
+ANOMALY_LABELS = {
+    'missing_check_out': '퇴근 누락',
+    'missing_check_in': '출근 누락',
+    'reversed': '퇴근이 출근보다 빠름',
+    'late': '지각',
+    'overlap': '다음 근무와 시간 겹침',
+    'trip_on_leave': '휴가/휴직 중 출장',
+    'trip_outside_hours': '근무시간 외 출장 출발',
+    'trip_without_attendance': '근태 기록 없는 출장',
+}
+
+ANOMALY_FIELDS = ['사원번호', '이름', '부서', '근무지', '일자', 'type', 'label', 'detail']
+
+
+def _attendance_frame(records):
+    import pandas as pd
+    df = pd.DataFrame(records, columns=ATTENDANCE_COLUMNS).fillna('')
+    day = df['날짜'].astype(str).str[:10]
+    check_in, check_out = df['출근시간'].astype(str), df['퇴근시간'].astype(str)
+    return pd.DataFrame({
+        '사원번호': df['사원번호'].astype(str),
+        '이름': df['이름'].astype(str),
+        '부서': df['부서'].astype(str),
+        '근무지': df['근무지'].astype(str),
+        '일자': day,
+        'month': day.str[:7],
+        # 빈 값은 mask 로 NaN → NaT (replace('', None) 은 pandas 1.5 에서 앞 값으로 채워짐)
+        'check_in': pd.to_datetime(check_in.mask(check_in == ''), errors='coerce'),
+        'check_out': pd.to_datetime(check_out.mask(check_out == ''), errors='coerce'),
+        '비고': df['비고'].astype(str),
+    })
+
+
+def _trip_frame(trips_by_kind):
+    import pandas as pd
+    frames = []
+    for kind, trips in trips_by_kind.items():
+        df = pd.DataFrame(trips, columns=TRIP_FIELDS).fillna('')
+        frames.append(pd.DataFrame({
+            '사원번호': df['user_id'].astype(str),
+            '일자': df['trip_date'].astype(str).str[:10],
+            'month': df['trip_date'].astype(str).str[:7],
+            'departure': pd.to_datetime(df['trip_date'].astype(str) + ' ' + df['departure_time'].astype(str), errors='coerce'),
+            'kind': kind,
+            'route': df['origin'].astype(str) + ' → ' + df['destination'].astype(str),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _digests(frame, columns):
+    # 사원별 행 해시 합 (행 순서와 무관) → 변경된 사원만 다시 분석
+    import pandas as pd
+    if frame.empty:
+        return {}
+    hashes = pd.util.hash_pandas_object(frame[columns].astype(str), index=False)
+    return hashes.groupby(frame['사원번호'].to_numpy()).sum().to_dict()
+
+
+def analyze(attendance, trips, late_after='09:00'):
+    # 사원별 시간순 근태 타임라인 + 같은 일자 출장을 벡터 연산으로 비교해 이상 행 DataFrame 반환
+    import pandas as pd
+    flags = []
+
+    def flag(frame, mask, code, detail):
+        # 내용 문자열은 걸린 행만 만듦 (strftime 이 전체 비교보다 훨씬 느림)
+        selected = frame.loc[mask]
+        if not selected.empty:
+            flags.append(selected.assign(type=code, label=ANOMALY_LABELS[code], detail=detail(selected)))
+
+    def hhmm(values):
+        return values.dt.strftime('%H:%M').fillna('')
+
+    att = attendance.sort_values(['사원번호', 'check_in', '일자'], kind='stable')
+    on_leave = att['비고'].isin(LEAVE_REMARKS)
+    has_in, has_out = att['check_in'].notna(), att['check_out'].notna()
+    late_hour, late_minute = (int(part) for part in late_after.split(':'))
+    arrival = att['check_in'].dt.hour * 60 + att['check_in'].dt.minute
+
+    flag(att, has_in & ~has_out & ~on_leave, 'missing_check_out', lambda f: '출근 ' + hhmm(f['check_in']))
+    flag(att, ~has_in & has_out & ~on_leave, 'missing_check_in', lambda f: '퇴근 ' + hhmm(f['check_out']))
+    flag(att, has_in & has_out & (att['check_out'] <= att['check_in']), 'reversed',
+         lambda f: hhmm(f['check_in']) + ' / ' + hhmm(f['check_out']))
+    flag(att, (att['비고'] == '정상') & (arrival > late_hour * 60 + late_minute), 'late', lambda f: '출근 ' + hhmm(f['check_in']))
+    # 같은 사원의 다음 근무 출근이 이번 퇴근보다 이르면 구간이 겹침
+    att = att.assign(next_in=att.groupby('사원번호', sort=False)['check_in'].shift(-1))
+    flag(att, has_out & (att['next_in'] < att['check_out']), 'overlap',
+         lambda f: '다음 출근 ' + f['next_in'].dt.strftime('%Y-%m-%d %H:%M'))
+
+    if not trips.empty:
+        merged = trips.merge(
+            att[['사원번호', '일자', '이름', '부서', '근무지', 'check_in', 'check_out', '비고']],
+            on=['사원번호', '일자'], how='left', indicator=True,
+        )
+        detail = lambda f: f['kind'].map({'local': '시내', 'outdoor': '시외'}) + ' ' + hhmm(f['departure']) + ' ' + f['route']
+        no_record = merged['_merge'] == 'left_only'
+        # 근태 기록이 없는 출장은 병합 후 이름/비고 등이 NaN
+        merged[['이름', '부서', '근무지', '비고']] = merged[['이름', '부서', '근무지', '비고']].fillna('')
+        flag(merged, no_record, 'trip_without_attendance', detail)
+        flag(merged, merged['비고'].isin(LEAVE_REMARKS), 'trip_on_leave', detail)
+        # 출장 비고가 붙은 날은 집에서 바로 출발할 수 있으므로 제외
+        outside = (merged['departure'] < merged['check_in']) | (merged['departure'] > merged['check_out'])
+        flag(merged, ~no_record & ~merged['비고'].str.startswith('출', na=False) & outside, 'trip_outside_hours', detail)
+
+    if not flags:
+        return pd.DataFrame(columns=ANOMALY_FIELDS)
+    return pd.concat(flags, ignore_index=True).reindex(columns=ANOMALY_FIELDS).fillna('')
+
+
+class AnomalyScanner:
+    # 월별 이상 근태 결과 캐시. 근태/출장 저장소 버전이 그대로면 캐시를 그대로 반환하고,
+    # 바뀌었으면 해당 월의 (사원별) 입력 해시를 비교해 달라진 사원만 다시 분석
+    def __init__(self, storage, user_directory, late_after='09:00'):
+        self.storage = storage
+        self.user_directory = user_directory
+        self.late_after = late_after
+        self._lock = threading.Lock()
+        self._version = None
+        self._frames = None
+        self._months = {}
+
+    def _load(self):
+        # trip_summary_version 은 출장 행이 추가/삭제/수정될 때마다 바뀜
+        version = (self.storage.attendance_version(), self.storage.trip_summary_version())
+        if version != self._version:
+            attendance = _attendance_frame(self.storage.list_attendance())
+            trips = _trip_frame({kind: self.storage.list_trips(kind) for kind in ('local', 'outdoor')})
+            self._frames = (attendance, trips)
+            self._version = version
+        return self._frames
+
+    def months(self):
+        with self._lock:
+            attendance, trips = self._load()
+            return sorted((set(attendance['month']) | set(trips['month'])) - {''}, reverse=True)
+
+    def scan(self, month):
+        # → (이상 목록 [dict], 다시 분석한 사원 수)
+        with self._lock:
+            attendance, trips = self._load()
+            cached = self._months.get(month)
+            if cached and cached['version'] == self._version:
+                return cached['anomalies'], 0
+
+            attendance = attendance[attendance['month'] == month]
+            trips = trips[trips['month'] == month]
+            att_digests = _digests(attendance, ['일자', '이름', '부서', '근무지', 'check_in', 'check_out', '비고'])
+            trip_digests = _digests(trips, ['일자', 'departure', 'kind', 'route'])
+            digests = {emp: (att_digests.get(emp), trip_digests.get(emp)) for emp in set(att_digests) | set(trip_digests)}
+
+            previous = cached or {'digests': {}, 'results': {}}
+            changed = {emp for emp, digest in digests.items() if previous['digests'].get(emp) != digest}
+            results = {emp: rows for emp, rows in previous['results'].items() if emp in digests and emp not in changed}
+            if changed:
+                found = analyze(
+                    attendance[attendance['사원번호'].isin(changed)],
+                    trips[trips['사원번호'].isin(changed)],
+                    self.late_after,
+                )
+                for emp in changed:
+                    results[emp] = []
+                for row in found.to_dict('records'):
+                    if not row['이름']:
+                        # 근태 기록이 없는 출장은 사용자 목록에서 이름/부서를 채움
+                        user = self.user_directory.get(row['사원번호'])
+                        row['이름'] = user.username if user else row['사원번호']
+                        row['부서'] = user.department if user else '미등록'
+                        row['근무지'] = self.user_directory.workplace(row['사원번호'])
+                    results[row['사원번호']].append(row)
+
+            anomalies = sorted((row for rows in results.values() for row in rows), key=lambda r: (r['일자'], r['사원번호'], r['type']))
+            self._months[month] = {'version': self._version, 'digests': digests, 'results': results, 'anomalies': anomalies}
+            return anomalies, len(changed)
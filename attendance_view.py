@@ -0,0 +1,136 @@
+import threading
+import time
+
+from storage import ATTENDANCE_COLUMNS
+from user_directory import WORKPLACES
+
+LOCATIONS = list(WORKPLACES)
+
+
+def iter_export_rows(records, approvals, workplace_of=None, workplace=None, department=None, month=None, status=None):
+    # 레코드 iterable → 결재상태를 반영해 조건에 맞는 행(ATTENDANCE_COLUMNS 순서)을 하나씩 반환.
+    # month 는 'YYYY-MM' (날짜 앞 7자리), status 가 None 이면 결재상태 무관
+    for record in records:
+        if month and not str(record.get('날짜', '')).startswith(month):
+            continue
+        record_workplace = record.get('근무지') or (workplace_of(record.get('사원번호')) if workplace_of else '')
+        if workplace and record_workplace != workplace:
+            continue
+        if department and record.get('부서') != department:
+            continue
+        record_status = approvals.get((record.get('사원번호'), str(record.get('날짜'))), record.get('결재상태') or '대기')
+        if status and record_status != status:
+            continue
+        row = dict(record, 근무지=record_workplace, 결재상태=record_status)
+        yield [row.get(col, '') for col in ATTENDANCE_COLUMNS]
+
+
+class AttendanceView:
+    # 근태 화면용 근무지 → 부서 → 레코드(결재상태 반영) 캐시.
+    # 이 워커의 쓰기는 증분 반영하고, 다른 워커의 쓰기는 저장소 버전 변경으로 감지해 재구성
+    def __init__(self, storage, user_directory, max_age=300):
+        self.storage = storage
+        self.user_directory = user_directory
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._view = None
+        self._index = {}
+        self._version = None
+        self._built_at = 0.0
+        # (근무지, 부서) → 변경 횟수: 화면 표 조각 캐시가 바뀐 부서만 다시 렌더링하도록
+        self._build = 0
+        self._revisions = {}
+
+    def _normalize(self, record, approvals):
+        record = {k: ('' if v is None else v) for k, v in record.items()}
+        if '근무지' not in record:
+            record['근무지'] = self.user_directory.workplace(record.get('사원번호'))
+        record.setdefault('결재상태', '대기')
+        record.setdefault('비고', '정상')
+        record['결재상태'] = approvals.get((record.get('사원번호'), str(record.get('날짜'))), record['결재상태'])
+        return record
+
+    def _add(self, record):
+        loc = record['근무지']
+        if loc in self._view and '부서' in record:
+            self._view[loc].setdefault(record['부서'], []).append(record)
+            self._touch(loc, record['부서'])
+            self._index.setdefault((record['사원번호'], str(record['날짜'])), []).append(record)
+
+    def _touch(self, loc, dept):
+        self._revisions[(loc, dept)] = self._revisions.get((loc, dept), 0) + 1
+
+    def _rebuild(self):
+        version = self.storage.attendance_version()
+        approvals = self.storage.load_approvals()
+        self._view = {loc: {} for loc in LOCATIONS}
+        self._index = {}
+        self._build += 1
+        self._revisions = {}
+        for record in self.storage.list_attendance():
+            self._add(self._normalize(record, approvals))
+        self._version = version
+        self._built_at = time.monotonic()
+
+    def _is_stale(self):
+        return (
+            self._view is None
+            or time.monotonic() - self._built_at > self.max_age
+            or self.storage.attendance_version() != self._version
+        )
+
+    def get(self):
+        with self._lock:
+            if self._is_stale():
+                self._rebuild()
+            # 렌더링 중 증분 갱신과 충돌하지 않도록 구조만 복사 (레코드는 공유)
+            return {loc: {dept: list(records) for dept, records in depts.items()} for loc, depts in self._view.items()}
+
+    def sections(self):
+        # get() 과 같은 복사본 + (근무지, 부서) → 버전 (같은 버전이면 표 내용도 같음)
+        with self._lock:
+            view = self.get()
+            return view, {key: (self._build, revision) for key, revision in self._revisions.items()}
+
+    def _apply(self, before, update):
+        # 쓰기 직전 버전이 캐시와 같을 때만 증분 반영, 아니면 다음 조회에서 재구성
+        with self._lock:
+            if self._view is None or before != self._version:
+                self._view = None
+                return
+            update()
+            self._version = self.storage.attendance_version()
+
+    def version(self):
+        return self.storage.attendance_version()
+
+    def apply_upload(self, before, records):
+        def update():
+            for record in records:
+                record = self._normalize(record, {})
+                if (record.get('사원번호'), str(record.get('날짜'))) not in self._index:
+                    self._add(record)
+        self._apply(before, update)
+
+    def apply_approvals(self, before, keys, status='승인'):
+        def update():
+            for key in keys:
+                for record in self._index.get((key[0], str(key[1])), []):
+                    record['결재상태'] = status
+                    self._touch(record['근무지'], record['부서'])
+        self._apply(before, update)
+
+    def apply_delete(self, before, employee_id, date):
+        def update():
+            removed = self._index.pop((employee_id, str(date)), [])
+            for record in removed:
+                dept_records = self._view[record['근무지']][record['부서']]
+                dept_records[:] = [r for r in dept_records if r is not record]
+                self._touch(record['근무지'], record['부서'])
+                if not dept_records:
+                    del self._view[record['근무지']][record['부서']]
+        self._apply(before, update)
+
+    def invalidate(self):
+        with self._lock:
+            self._view = None
@@ -0,0 +1,98 @@
+# 워커 1개 기준 로그인 처리량 측정: python bench/login.py --users 500 --threads 16 [--login-workers 4] [--fail-ratio 0.2]
+# bcrypt 해시가 저장된 users.csv 를 임시 디렉터리에 만들고 Flask test client 로 /login 을 동시에 호출
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from credentials import hash_password  # noqa: E402
+from storage import CsvStorage  # noqa: E402
+
+PASSWORD = 'bench-pw'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--logins', type=int, default=400, help='전체 로그인 시도 수')
+    parser.add_argument('--threads', type=int, default=16, help='동시 요청 스레드 수')
+    parser.add_argument('--login-workers', type=int, default=4, help='bcrypt 스레드 풀 크기 (LOGIN_WORKERS)')
+    parser.add_argument('--rounds', type=int, default=12, help='bcrypt cost (BCRYPT_ROUNDS)')
+    parser.add_argument('--fail-ratio', type=float, default=0.2, help='틀린 비밀번호 비율 (같은 틀린 값 반복)')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='bench_login_')
+    # salt 가 포함된 해시이므로 모든 사용자가 같은 해시를 써도 검증 비용은 동일
+    hashed = hash_password(PASSWORD, args.rounds)
+    storage = CsvStorage(work_dir)
+    with open(storage.users_path, 'w', encoding='utf-8', newline='') as f:
+        for i in range(args.users):
+            f.write(f'E{i:05d},사원{i},{hashed},부서{i % 12},논산,사원,,2024-01-01 00:00:00\n')
+
+    os.environ.update({
+        'FLASK_SECRET_KEY': 'bench',
+        'DATA_DIR': work_dir,
+        'GEO_CACHE_PATH': os.path.join(work_dir, 'geo_cache.db'),
+        'GAZETTEER_PATH': os.path.join(work_dir, 'gazetteer.csv'),
+        'JOBS_DIR': os.path.join(work_dir, 'jobs'),
+        'PROFILE_DIR': os.path.join(work_dir, 'profiles'),
+        'LOGIN_WORKERS': str(args.login_workers),
+        'BCRYPT_ROUNDS': str(args.rounds),
+        'LOGIN_MAX_FAILURES': str(args.logins),
+    })
+    try:
+        import app as app_module
+        app = app_module.app
+
+        rng = np.random.default_rng(0)
+        attempts = [
+            (f'E{int(i):05d}', 'wrong-pw' if fail else PASSWORD)
+            for i, fail in zip(rng.integers(0, args.users, args.logins), rng.random(args.logins) < args.fail_ratio)
+        ]
+        latencies = [0.0] * len(attempts)
+        outcomes = [None] * len(attempts)
+        counter = iter(range(len(attempts)))
+        counter_lock = threading.Lock()
+
+        def worker():
+            client = app.test_client()
+            while True:
+                with counter_lock:
+                    i = next(counter, None)
+                if i is None:
+                    return
+                user_id, password = attempts[i]
+                start = time.perf_counter()
+                response = client.post('/login', data={'user_id': user_id, 'password': password})
+                latencies[i] = time.perf_counter() - start
+                outcomes[i] = response.status_code == 302
+
+        threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        ms = np.array(latencies) * 1000
+        ok = sum(1 for o in outcomes if o)
+        print(f'users={args.users} logins={len(attempts)} threads={args.threads} '
+              f'login_workers={args.login_workers} rounds={args.rounds}')
+        print(f'{len(attempts) / elapsed:8.1f} logins/s  ({ok} ok, {len(attempts) - ok} failed, {elapsed:.2f}s)')
+        print(f'latency ms  p50={np.percentile(ms, 50):.1f}  p90={np.percentile(ms, 90):.1f}  '
+              f'p99={np.percentile(ms, 99):.1f}  max={ms.max():.1f}')
+        print('credential stats:', app_module.credentials.stats)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
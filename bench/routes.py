@@ -0,0 +1,299 @@
+# 라우트별 지연시간/메모리 측정: python bench/routes.py --rows 10000 [--backend sqlite] [--routes admin_trips,admin_attendance]
+# 임시 디렉터리에 합성 users/trips/attendance/approvals CSV 와 근태 .xlsx 를 만들고, Kakao API 는 로컬 스텁으로 대체한 뒤
+# Flask test client 로 각 라우트를 호출해 p50/p90/p99 지연시간과 1회 호출 시 최대 메모리 사용량을 출력
+import argparse
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from attendance_ingest import synthetic_punches  # noqa: E402
+from storage import ATTENDANCE_COLUMNS, APPROVAL_COLUMNS, CsvStorage, SqliteStorage, import_csv  # noqa: E402
+
+WORKPLACES = ['논산', '대전', '수원']
+PLACES = ['논산IC', '서울IC', '대전역', '수원역', '천안아산역', '세종청사']
+BENCH_PASSWORD = 'bench-pw'
+
+
+class KakaoStub(BaseHTTPRequestHandler):
+    # 주소 검색/길찾기 응답을 고정값으로 돌려주는 로컬 스텁
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.startswith('/v2/local/search/address.json'):
+            body = {'documents': [{'x': '127.1', 'y': '36.5'}]}
+        else:
+            body = {'routes': [{'summary': {'distance': 12345}}]}
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_kakao_stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KakaoStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def write_users(path, n_users):
+    ids = [f'E{i:05d}' for i in range(n_users)]
+    df = pd.DataFrame({
+        'user_id': ['admin'] + ids,
+        'username': ['관리자'] + [f'사원{i}' for i in range(n_users)],
+        'password': BENCH_PASSWORD,
+        'department': ['관리'] + [f'부서{i % 12}' for i in range(n_users)],
+        'workplace': ['논산'] + [WORKPLACES[i % 3] for i in range(n_users)],
+        'position': '사원',
+        'email': '',
+        'register_date': '2024-01-01 00:00:00',
+    })
+    df.to_csv(path, header=False, index=False)
+    return ids
+
+
+def write_trips(path, n_trips, user_ids, seed):
+    rng = np.random.default_rng(seed)
+    base = np.datetime64('2024-01-01T08:00:00')
+    submit = (base + np.arange(n_trips) * np.timedelta64(97, 's')).astype(str)
+    df = pd.DataFrame({
+        'user_id': rng.choice(user_ids, n_trips),
+        'submit_time': np.char.replace(submit, 'T', ' '),
+        'trip_date': np.array([s[:10] for s in submit]),
+        'departure_time': '09:00',
+        'origin': rng.choice(PLACES, n_trips),
+        'car_number': '12가3456',
+        'purpose': '업무',
+        'destination': rng.choice(PLACES, n_trips),
+        'distance': [f'{d:.2f} km' for d in rng.uniform(5, 200, n_trips)],
+    })
+    df.to_csv(path, header=False, index=False)
+
+
+def write_attendance(base_dir, n_records, user_ids, seed):
+    # (사원번호, 날짜) 가 겹치지 않도록 사원 x 일자 격자에서 생성, 절반은 승인 상태
+    rng = np.random.default_rng(seed)
+    n_days = max(1, -(-n_records // len(user_ids)))
+    days = pd.date_range('2024-01-01', periods=n_days).strftime('%Y-%m-%d').to_numpy()
+    emp = np.array(user_ids)[np.arange(n_records) % len(user_ids)]
+    emp_idx = np.arange(n_records) % len(user_ids)
+    date = np.char.add(days[np.arange(n_records) // len(user_ids)], ' 08:30:00')
+    df = pd.DataFrame({
+        '사원번호': emp,
+        '이름': np.char.add('사원', emp_idx.astype(str)),
+        '부서': np.char.add('부서', (emp_idx % 12).astype(str)),
+        '출근시간': date,
+        '퇴근시간': np.char.add(days[np.arange(n_records) // len(user_ids)], ' 18:00:00'),
+        '날짜': date,
+        '결재상태': '대기',
+        '근무지': np.array(WORKPLACES)[emp_idx % 3],
+        '비고': '정상',
+    }, columns=ATTENDANCE_COLUMNS)
+    df.to_csv(os.path.join(base_dir, 'attendance.csv'), index=False)
+    approved = df.loc[rng.random(n_records) < 0.5, ['사원번호', '날짜']].assign(상태='승인')
+    approved.columns = APPROVAL_COLUMNS
+    approved.to_csv(os.path.join(base_dir, 'approvals.csv'), index=False)
+    return list(zip(df['사원번호'], df['날짜']))
+
+
+def punch_workbook(n_punches, n_employees):
+    df = synthetic_punches(n_punches, n_employees, seed=1)
+    buf = io.BytesIO()
+    df.to_excel(buf, index=False)
+    return buf.getvalue()
+
+
+def build_routes(clients, user_ids, attendance_keys, upload_bytes, distance_queue):
+    admin, user, anon = clients['admin'], clients['user'], clients['anon']
+    delete_keys = iter(attendance_keys[::-1])
+
+    def login(i):
+        return anon.post('/login', data={'user_id': user_ids[i % len(user_ids)], 'password': BENCH_PASSWORD})
+
+    def local_trip_post(i):
+        return user.post('/local_trip', data={
+            'trip_date': '2024-06-01', 'departure_time': '09:00', 'origin': PLACES[i % len(PLACES)],
+            'destination': PLACES[(i + 1) % len(PLACES)], 'car_number': '12가3456', 'purpose': 'bench',
+        })
+
+    def local_trip_resolved(i):
+        # 신청 후 백그라운드 거리 계산 결과가 저장소에 반영될 때까지 (submit → resolve 전체 비용)
+        response = local_trip_post(i)
+        while distance_queue.pending_count():
+            time.sleep(0.0005)
+        return response
+
+    def upload(i):
+        return admin.post('/admin_attendance', data={'file': (io.BytesIO(upload_bytes), 'punches.xlsx')},
+                          content_type='multipart/form-data')
+
+    def delete_data(i):
+        employee_id, date = next(delete_keys)
+        return admin.post('/admin_attendance', data={'action': 'delete_data', 'employee_id': employee_id, 'date': date})
+
+    def revalidate(path):
+        # 직전 응답의 ETag 로 조건부 GET (데이터가 그대로면 304)
+        etag = {}
+
+        def request(i):
+            response = admin.get(path, headers={'If-None-Match': etag.get('value', '')})
+            etag['value'] = response.headers.get('ETag', '')
+            return response
+        return request
+
+    return [
+        ('login', login),
+        ('local_trip GET', lambda i: user.get('/local_trip')),
+        ('local_trip POST', local_trip_post),
+        ('local_trip POST+resolve', local_trip_resolved),
+        ('api_trips', lambda i: admin.get('/api/trips/local', query_string={'limit': 100})),
+        ('admin_trips', lambda i: admin.get('/admin_trips')),
+        ('admin_trips 304', revalidate('/admin_trips')),
+        ('trip_summary', lambda i: admin.get('/admin/trip_summary', query_string={'month': '2024-01', 'format': 'json'})),
+        ('admin_attendance GET', lambda i: admin.get('/admin_attendance')),
+        ('admin_attendance 304', revalidate('/admin_attendance')),
+        ('admin_attendance upload', upload),
+        ('admin_attendance approve_all', lambda i: admin.post('/admin_attendance', data={
+            'action': 'approve_all', 'loc': WORKPLACES[i % 3], 'dept': f'부서{i % 12}'})),
+        ('admin_attendance delete_data', delete_data),
+        ('attendance_anomalies', lambda i: admin.get('/admin/attendance_anomalies', query_string={'month': '2024-01', 'format': 'json'})),
+        ('generate_attendance_excel', lambda i: admin.get('/generate_attendance_excel')),
+    ]
+
+
+def login_client(app, user_id):
+    client = app.test_client()
+    response = client.post('/login', data={'user_id': user_id, 'password': BENCH_PASSWORD})
+    if response.status_code != 302:
+        raise SystemExit(f'login failed for {user_id}: {response.status_code}')
+    return client
+
+
+def measure(name, fn, iterations, warmup):
+    for i in range(warmup):
+        fn(i)
+    timings = []
+    statuses = set()
+    for i in range(warmup, warmup + iterations):
+        start = time.perf_counter()
+        response = fn(i)
+        # 스트리밍 응답은 본문을 끝까지 읽어야 생성이 끝남
+        response.get_data()
+        timings.append(time.perf_counter() - start)
+        statuses.add(response.status_code)
+        response.close()
+    # tracemalloc 은 실행을 크게 늦추므로 최대 메모리는 별도 1회 호출로 측정
+    tracemalloc.start()
+    response = fn(warmup + iterations)
+    response.get_data()
+    response.close()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    ms = np.array(timings) * 1000
+    return {
+        'route': name,
+        'n': len(timings),
+        'p50_ms': round(float(np.percentile(ms, 50)), 2),
+        'p90_ms': round(float(np.percentile(ms, 90)), 2),
+        'p99_ms': round(float(np.percentile(ms, 99)), 2),
+        'max_ms': round(float(ms.max()), 2),
+        'peak_mb': round(peak / 1e6, 2),
+        'status': sorted(statuses),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10000, help='출장/근태 기본 행 수 (1000 ~ 1000000)')
+    parser.add_argument('--users', type=int, help='기본값: rows/50 (최소 20)')
+    parser.add_argument('--trips', type=int, help='시내/시외 각각, 기본값: rows')
+    parser.add_argument('--attendance', type=int, help='기본값: rows')
+    parser.add_argument('--punches', type=int, help='업로드 .xlsx 태그 수, 기본값: min(rows, 20000)')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--backend', choices=['csv', 'sqlite'], default='csv')
+    parser.add_argument('--routes', help='쉼표로 구분한 라우트 이름 일부 (예: admin_trips,upload)')
+    parser.add_argument('--json', help='결과를 JSON 파일로 저장')
+    parser.add_argument('--keep', action='store_true', help='임시 데이터 디렉터리 유지')
+    args = parser.parse_args()
+
+    n_users = args.users or max(20, args.rows // 50)
+    n_trips = args.trips or args.rows
+    n_attendance = args.attendance or args.rows
+    n_punches = args.punches or min(args.rows, 20000)
+
+    work_dir = tempfile.mkdtemp(prefix='bench_routes_')
+    start = time.perf_counter()
+    user_ids = write_users(os.path.join(work_dir, 'users.csv'), n_users)
+    write_trips(os.path.join(work_dir, 'local_trips.csv'), n_trips, user_ids, seed=1)
+    write_trips(os.path.join(work_dir, 'outdoor_trips.csv'), n_trips, user_ids, seed=2)
+    attendance_keys = write_attendance(work_dir, n_attendance, user_ids, seed=3)
+    upload_bytes = punch_workbook(n_punches, n_users)
+    sqlite_path = os.path.join(work_dir, 'total.db')
+    if args.backend == 'sqlite':
+        import_csv(CsvStorage(work_dir), SqliteStorage(sqlite_path))
+    print(f'data: users={n_users} trips={n_trips}x2 attendance={n_attendance} punches={n_punches} '
+          f'({time.perf_counter() - start:.1f}s, {work_dir})')
+
+    server, stub_url = start_kakao_stub()
+    os.environ.update({
+        'FLASK_SECRET_KEY': 'bench',
+        'KAKAO_API_KEY': 'bench',
+        'KAKAO_LOCAL_BASE_URL': stub_url,
+        'KAKAO_NAVI_BASE_URL': stub_url,
+        'STORAGE_BACKEND': args.backend,
+        'DATA_DIR': work_dir,
+        'SQLITE_PATH': sqlite_path,
+        'GEO_CACHE_PATH': os.path.join(work_dir, 'geo_cache.db'),
+        'GAZETTEER_PATH': os.path.join(work_dir, 'gazetteer.csv'),
+        'JOBS_DIR': os.path.join(work_dir, 'jobs'),
+        'PROFILE_DIR': os.path.join(work_dir, 'profiles'),
+        'DISTANCE_MODE': 'api',
+    })
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        import app as app_module
+        app = app_module.app
+        clients = {'admin': login_client(app, 'admin'), 'user': login_client(app, user_ids[0]), 'anon': app.test_client()}
+        routes = build_routes(clients, user_ids, attendance_keys, upload_bytes, app_module.distance_queue)
+        if args.routes:
+            wanted = [r.strip() for r in args.routes.split(',') if r.strip()]
+            routes = [(name, fn) for name, fn in routes if any(w in name for w in wanted)]
+
+        results = []
+        print(f"{'route':32} {'n':>4} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} {'peak MB':>8}  status")
+        for name, fn in routes:
+            result = measure(name, fn, args.iterations, args.warmup)
+            results.append(result)
+            print(f"{name:32} {result['n']:>4} {result['p50_ms']:>9.2f} {result['p90_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                  f"{result['max_ms']:>9.2f} {result['peak_mb']:>8.2f}  {result['status']}")
+        app_module.distance_queue.shutdown(wait=True)
+    finally:
+        os.chdir(cwd)
+        server.shutdown()
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'results': results}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+# 워커 기동 시간 측정: python bench/startup.py [--rev HEAD~1] [--repeat 5] [--gunicorn]
+# 새 프로세스에서 app import 시간과 주요 라우트의 첫 요청 지연시간을 측정 (첫 요청 = 지연 import 비용 포함).
+# --rev 를 주면 해당 git revision 을 임시 디렉터리에 풀어 같은 측정을 하고 나란히 출력.
+# --gunicorn 은 gunicorn 을 실제로 띄워 기동 → 첫 응답, 첫 업로드 요청 시간을 측정 (gunicorn 설치 필요)
+import argparse
+import http.cookiejar
+import io
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import uuid
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from attendance_ingest import synthetic_punches  # noqa: E402
+
+ADMIN_PASSWORD = 'bench-pw'
+
+# 측정 대상 프로세스에서 실행할 코드 (현재 트리/과거 revision 공통)
+CHILD = r'''
+import json, sys, time
+start = time.perf_counter()
+import app
+result = {'import app': time.perf_counter() - start}
+client = app.app.test_client()
+
+def timed(name, fn):
+    start = time.perf_counter()
+    response = fn()
+    response.get_data()
+    result[name] = time.perf_counter() - start
+
+timed('GET /login', lambda: client.get('/login'))
+timed('POST /login', lambda: client.post('/login', data={'user_id': 'admin', 'password': sys.argv[2]}))
+timed('GET /admin_attendance', lambda: client.get('/admin_attendance'))
+with open(sys.argv[1], 'rb') as f:
+    timed('POST /admin_attendance (upload)', lambda: client.post(
+        '/admin_attendance', data={'file': (f, 'punches.xlsx')}, content_type='multipart/form-data'))
+timed('GET /generate_attendance_excel', lambda: client.get('/generate_attendance_excel'))
+print(json.dumps(result))
+'''
+
+
+def make_data_dir(base):
+    data_dir = tempfile.mkdtemp(prefix='data_', dir=base)
+    with open(os.path.join(data_dir, 'users.csv'), 'w', encoding='utf-8', newline='') as f:
+        f.write(f'admin,관리자,{ADMIN_PASSWORD},관리,논산,사원,,2024-01-01 00:00:00\n')
+        for i in range(50):
+            f.write(f'E{i:05d},사원{i},pw,부서{i % 12},논산,사원,,2024-01-01 00:00:00\n')
+    return data_dir
+
+
+def child_env(data_dir):
+    env = dict(os.environ)
+    env.update({
+        'FLASK_SECRET_KEY': 'bench',
+        'DATA_DIR': data_dir,
+        'GEO_CACHE_PATH': os.path.join(data_dir, 'geo_cache.db'),
+        'GAZETTEER_PATH': os.path.join(data_dir, 'gazetteer.csv'),
+        'JOBS_DIR': os.path.join(data_dir, 'jobs'),
+        'PROFILE_DIR': os.path.join(data_dir, 'profiles'),
+        # 평문 → 해시 전환 비용이 첫 로그인 측정을 가리지 않도록 최소 cost
+        'BCRYPT_ROUNDS': '4',
+    })
+    return env
+
+
+def run_child(tree, work_dir, upload_path):
+    data_dir = make_data_dir(work_dir)
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, '-c', CHILD, upload_path, ADMIN_PASSWORD],
+        cwd=tree, env=child_env(data_dir), capture_output=True, text=True, check=True,
+    )
+    total = time.perf_counter() - start
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result['process total'] = total
+    return result
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def multipart(field, filename, data):
+    boundary = uuid.uuid4().hex
+    body = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        'Content-Type: application/octet-stream\r\n\r\n'
+    ).encode() + data + f'\r\n--{boundary}--\r\n'.encode()
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+def run_gunicorn(tree, work_dir, upload_bytes, workers):
+    data_dir = make_data_dir(work_dir)
+    port = free_port()
+    base = f'http://127.0.0.1:{port}'
+    cmd = [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', str(workers)]
+    if os.path.exists(os.path.join(tree, 'gunicorn.conf.py')):
+        cmd += ['-c', 'gunicorn.conf.py']
+    env = child_env(data_dir)
+    env['WEB_CONCURRENCY'] = str(workers)
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd + ['app:app'], cwd=tree, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        while True:
+            if proc.poll() is not None:
+                raise SystemExit(f'gunicorn exited with {proc.returncode} in {tree}')
+            try:
+                opener.open(f'{base}/login', timeout=1).read()
+                break
+            except OSError:
+                time.sleep(0.02)
+        result = {'boot → first response': time.perf_counter() - start}
+        opener.open(f'{base}/login', data=f'user_id=admin&password={ADMIN_PASSWORD}'.encode()).read()
+        body, content_type = multipart('file', 'punches.xlsx', upload_bytes)
+        request = urllib.request.Request(f'{base}/admin_attendance', data=body, headers={'Content-Type': content_type})
+        upload_start = time.perf_counter()
+        opener.open(request).read()
+        result['first upload (HTTP)'] = time.perf_counter() - upload_start
+        return result
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def export_rev(rev, work_dir):
+    tree = tempfile.mkdtemp(prefix='tree_', dir=work_dir)
+    archive = subprocess.run(['git', 'archive', rev], cwd=ROOT, capture_output=True, check=True).stdout
+    subprocess.run(['tar', '-x', '-C', tree], input=archive, check=True)
+    return tree
+
+
+def median_results(runs):
+    return {name: float(np.median([run[name] for run in runs])) for name in runs[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rev', help='비교할 git revision (예: HEAD~1)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--punches', type=int, default=2000, help='첫 업로드 요청의 태그 수')
+    parser.add_argument('--gunicorn', action='store_true')
+    parser.add_argument('--workers', type=int, default=2, help='--gunicorn 워커 수')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='bench_startup_')
+    try:
+        buf = io.BytesIO()
+        synthetic_punches(args.punches, 50, seed=0).to_excel(buf, index=False)
+        upload_path = os.path.join(work_dir, 'punches.xlsx')
+        with open(upload_path, 'wb') as f:
+            f.write(buf.getvalue())
+
+        trees = [('current', ROOT)]
+        if args.rev:
+            trees.insert(0, (args.rev, export_rev(args.rev, work_dir)))
+
+        columns = {}
+        for label, tree in trees:
+            # 바이트코드 컴파일 시간이 섞이지 않도록 미리 컴파일
+            subprocess.run([sys.executable, '-m', 'compileall', '-q', tree], check=True, stdout=subprocess.DEVNULL)
+            runs = []
+            for _ in range(args.repeat):
+                run = run_child(tree, work_dir, upload_path)
+                if args.gunicorn:
+                    run.update(run_gunicorn(tree, work_dir, buf.getvalue(), args.workers))
+                runs.append(run)
+            columns[label] = median_results(runs)
+
+        names = list(dict.fromkeys(name for result in columns.values() for name in result))
+        print(f'median of {args.repeat} fresh processes (ms)')
+        print(f"{'':34}" + ''.join(f'{label:>14}' for label in columns))
+        for name in names:
+            cells = ''.join(f"{columns[label][name] * 1000:>14.1f}" if name in columns[label] else f"{'-':>14}" for label in columns)
+            print(f'{name:34}{cells}')
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
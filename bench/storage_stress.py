@@ -0,0 +1,128 @@
+# CSV 저장소 동시 쓰기 스트레스: python bench/storage_stress.py --processes 4 --threads 4 --writes 200 --rate 500
+# 여러 프로세스(gunicorn 워커 역할) x 스레드가 같은 DATA_DIR 에 동시에 쓰고, 끝난 뒤 유실/손상 행이 없는지 검증
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import CsvStorage, TRIP_FIELDS  # noqa: E402
+
+
+def worker(base_dir, proc, args, barrier, results):
+    storage = CsvStorage(base_dir, compact_threshold=args.compact_threshold, fsync=args.fsync)
+    barrier.wait()
+
+    failures = []
+
+    def run(thread):
+        try:
+            write(thread)
+        except Exception as e:
+            failures.append(e)
+            raise
+
+    def write(thread):
+        tag = f'p{proc:02d}t{thread:02d}'
+        for i in range(args.writes):
+            submit_time = f'{tag}-{i:06d}'
+            storage.add_trip('local', [tag, submit_time, '2024-01-01', '09:00', '논산', '12가3456', 'stress', '대전', '10.00 km'])
+            if i % 10 == 0:
+                storage.add_approvals([(tag, submit_time, '승인')])
+                storage.add_attendance([{'사원번호': tag, '이름': tag, '부서': 'stress', '날짜': submit_time, '결재상태': '대기', '근무지': '논산', '비고': '정상'}])
+            if i % 50 == 0:
+                # 다른 스레드/프로세스의 append 와 경쟁하는 전체 재작성
+                storage.upsert_user([tag, tag, 'pw', 'stress', '논산', '사원', '', str(i)])
+                storage.delete_trip('local', 'no-such-trip')
+            if i % 30 == 0:
+                storage.delete_attendance(tag, submit_time)
+
+    threads = [threading.Thread(target=run, args=(t,)) for t in range(args.threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if failures:
+        sys.exit(1)
+    results.put(time.perf_counter() - start)
+
+
+def verify(base_dir, args):
+    storage = CsvStorage(base_dir)
+    tags = [f'p{p:02d}t{t:02d}' for p in range(args.processes) for t in range(args.threads)]
+    writes = range(args.writes)
+    errors = []
+
+    trips = storage.list_trips('local')
+    if any(len(trip) != len(TRIP_FIELDS) for trip in trips):
+        errors.append('malformed trip rows')
+    expected = {f'{tag}-{i:06d}' for tag in tags for i in writes}
+    got = [trip[1] for trip in trips]
+    if len(got) != len(set(got)) or set(got) != expected:
+        errors.append(f'trips: expected {len(expected)}, got {len(got)} ({len(set(got))} unique)')
+
+    users = {row[0]: row for row in storage.list_users()}
+    last = str(max(i for i in writes if i % 50 == 0))
+    if set(users) != set(tags) or any(users[tag][7] != last for tag in tags):
+        errors.append(f'users: expected {len(tags)}, got {len(users)}')
+
+    approved = {f'{tag}-{i:06d}' for tag in tags for i in writes if i % 10 == 0 and i % 30 != 0}
+    approvals = {date for (emp, date), status in storage.load_approvals().items() if status == '승인'}
+    if approvals != approved:
+        errors.append(f'approvals: expected {len(approved)}, got {len(approvals)}')
+
+    attendance = [r['날짜'] for r in storage.list_attendance()]
+    if len(attendance) != len(set(attendance)) or set(attendance) != approved:
+        errors.append(f'attendance: expected {len(approved)}, got {len(attendance)}')
+    return errors
+
+
+def count_ops(args):
+    per_thread = sum(1 + (2 if i % 10 == 0 else 0) + (2 if i % 50 == 0 else 0) + (1 if i % 30 == 0 else 0) for i in range(args.writes))
+    return per_thread * args.threads * args.processes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--writes', type=int, default=200, help='스레드당 출장 신청 수')
+    parser.add_argument('--rate', type=float, default=0, help='목표 쓰기/초 (미달 시 실패)')
+    parser.add_argument('--compact-threshold', type=int, default=50)
+    parser.add_argument('--fsync', action='store_true')
+    parser.add_argument('--dir', help='기본값: 임시 디렉터리')
+    args = parser.parse_args()
+
+    base_dir = args.dir or tempfile.mkdtemp(prefix='storage_stress_')
+    ctx = mp.get_context('spawn')
+    barrier = ctx.Barrier(args.processes)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(base_dir, p, args, barrier, results)) for p in range(args.processes)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    if any(p.exitcode != 0 for p in procs):
+        print('worker process failed')
+        sys.exit(1)
+    elapsed = max(results.get() for _ in procs)
+
+    ops = count_ops(args)
+    rate = ops / elapsed
+    print(f'{args.processes} procs x {args.threads} threads: {ops} writes in {elapsed:.2f}s = {rate:.0f} writes/s ({base_dir})')
+    errors = verify(base_dir, args)
+    for error in errors:
+        print('LOST/CORRUPT:', error)
+    if args.rate and rate < args.rate:
+        errors.append('rate')
+        print(f'below target rate {args.rate:.0f} writes/s')
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+# bcrypt 는 72바이트까지만 사용 (bcrypt 5 는 초과 시 ValueError) → 해시/검증 모두 잘라서 일관되게 처리
+BCRYPT_MAX_BYTES = 72
+HASH_PREFIXES = ('$2a$', '$2b$', '$2y$')
+
+
+def _encode(password):
+    return (password or '').encode('utf-8')[:BCRYPT_MAX_BYTES]
+
+
+def is_hashed(stored):
+    return bool(stored) and stored.startswith(HASH_PREFIXES)
+
+
+def hash_password(password, rounds=12):
+    return bcrypt.hashpw(_encode(password), bcrypt.gensalt(rounds)).decode('ascii')
+
+
+def check_password(password, stored):
+    if is_hashed(stored):
+        try:
+            return bcrypt.checkpw(_encode(password), stored.encode('ascii'))
+        except ValueError:
+            return False
+    # 해시 전환 전 평문 행
+    return bool(stored) and hmac.compare_digest((password or '').encode('utf-8'), stored.encode('utf-8'))
+
+
+class CredentialStore:
+    # UserDirectory 색인으로 사용자를 찾고 bcrypt 검증은 크기가 제한된 스레드 풀에서 실행
+    # (요청 스레드가 모두 해시 계산에 묶이지 않도록). 평문 비밀번호는 로그인 성공 시 해시로 교체.
+    # 실패 결과는 (사용자, 저장된 해시, 입력값 digest) 로 캐시하고, 짧은 시간에 실패가 몰린 (ID, 접속 주소) 는 검증 없이 거부
+    # (ID 만으로 막으면 누구나 틀린 비밀번호를 반복해 다른 사용자를 계속 잠글 수 있음)
+    def __init__(self, storage, user_directory, workers=4, rounds=12,
+                 fail_ttl=60, max_failures=10, fail_window=60, max_entries=10000):
+        self.storage = storage
+        self.user_directory = user_directory
+        self.rounds = rounds
+        self.fail_ttl = fail_ttl
+        self.max_failures = max_failures
+        self.fail_window = fail_window
+        self.max_entries = max_entries
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._lock = threading.Lock()
+        # 입력 비밀번호는 프로세스별 임의 키로 digest 해서만 보관
+        self._key = os.urandom(16)
+        # 없는 ID 검증용 해시. 기동(import) 시간에 bcrypt 비용이 들지 않도록 처음 필요할 때 생성
+        self._dummy_hash = None
+        self._failed = OrderedDict()
+        self._attempts = {}
+        self.stats = {'verified': 0, 'rejected': 0, 'cached': 0, 'throttled': 0, 'upgraded': 0}
+
+    def _digest(self, password):
+        return hashlib.blake2b((password or '').encode('utf-8'), key=self._key, digest_size=16).digest()
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _throttled(self, client, now):
+        window_start, count = self._attempts.get(client, (now, 0))
+        return now - window_start < self.fail_window and count >= self.max_failures
+
+    def _record_failure(self, client, key, now):
+        with self._lock:
+            window_start, count = self._attempts.get(client, (now, 0))
+            if now - window_start >= self.fail_window:
+                window_start, count = now, 0
+            self._attempts[client] = (window_start, count + 1)
+            self._failed[key] = now
+            self._failed.move_to_end(key)
+            while len(self._failed) > self.max_entries:
+                self._failed.popitem(last=False)
+            if len(self._attempts) > self.max_entries:
+                self._attempts = {c: v for c, v in self._attempts.items() if now - v[0] < self.fail_window}
+
+    def hash(self, password):
+        return self._executor.submit(hash_password, password, self.rounds).result()
+
+    def hash_many(self, passwords):
+        return list(self._executor.map(hash_password, passwords, [self.rounds] * len(passwords)))
+
+    def _dummy(self):
+        # 없는 ID 도 같은 비용의 bcrypt 검증을 거치도록 (응답 시간으로 ID 존재 여부를 알 수 없게)
+        with self._lock:
+            if self._dummy_hash is None:
+                self._dummy_hash = hash_password(os.urandom(16).hex(), self.rounds)
+            return self._dummy_hash
+
+    def verify(self, user_id, password, remote_addr=None):
+        # 성공 시 User, 실패 시 None
+        user = self.user_directory.get(user_id) if user_id else None
+        stored = user.password if user else ''
+        key = (user_id, stored, self._digest(password))
+        client = (user_id, remote_addr)
+        now = time.monotonic()
+        with self._lock:
+            throttled = self._throttled(client, now)
+            failed_at = self._failed.get(key)
+        if throttled:
+            self._count('throttled')
+            return None
+        if failed_at is not None and now - failed_at < self.fail_ttl:
+            self._count('cached')
+            return None
+        matched = self._executor.submit(check_password, password, stored if user else self._dummy()).result()
+        if user is None or not matched:
+            self._record_failure(client, key, now)
+            self._count('rejected')
+            return None
+
+        with self._lock:
+            self._attempts.pop(client, None)
+        self._count('verified')
+        if not is_hashed(stored):
+            self._upgrade(user, password)
+        return user
+
+    def _upgrade(self, user, password):
+        row = list(user)
+        row[2] = self.hash(password)
+        self.storage.upsert_user(row)
+        self.user_directory.invalidate()
+        self._count('upgraded')
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
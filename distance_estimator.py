@@ -0,0 +1,108 @@
+import math
+import threading
+from collections import OrderedDict
+
+from geo_cache import normalize_address
+
+# numpy 는 추정 계산을 처음 할 때 불러옴 (워커 기동 시간 단축)
+EARTH_RADIUS_KM = 6371.0088
+# 추정 거리 표시 (저장 형식 "12.34 km (추정)")
+ESTIMATED_MARK = '(추정)'
+
+
+def format_estimate(distance_km):
+    return f"{distance_km:.2f} km {ESTIMATED_MARK}"
+
+
+def haversine_km(x1, y1, x2, y2):
+    # 경도(x)/위도(y) 배열 → 대원거리(km) 배열
+    import numpy as np
+    x1, y1, x2, y2 = (np.radians(np.asarray(v, dtype=float)) for v in (x1, y1, x2, y2))
+    a = np.sin((y2 - y1) / 2) ** 2 + np.cos(y1) * np.cos(y2) * np.sin((x2 - x1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class DistanceEstimator:
+    # 직선거리 x 도로 우회 계수로 도로 거리를 추정 (API 없이 벡터 연산)
+    def __init__(self, road_factor=1.2):
+        self.road_factor = road_factor
+
+    def estimate_many(self, origins, destinations):
+        import numpy as np
+        origins = np.asarray(origins, dtype=float).reshape(-1, 2)
+        destinations = np.asarray(destinations, dtype=float).reshape(-1, 2)
+        return haversine_km(origins[:, 0], origins[:, 1], destinations[:, 0], destinations[:, 1]) * self.road_factor
+
+    def estimate(self, origin_xy, destination_xy):
+        return float(self.estimate_many([origin_xy], [destination_xy])[0])
+
+
+class SiteMatrix:
+    # 주소 사전(사업장/IC) 쌍 거리. 전체 N×N 행렬 대신 요청된 쌍만 벡터 연산으로 추정해 LRU 로 보관하고,
+    # 주소 사전이 다시 읽히면 캐시를 비움. geo_cache 에 Kakao 실측 거리가 있는 쌍은 조회 때마다 실측값 사용
+    def __init__(self, estimator, sites, measured=None, max_entries=50000):
+        self.estimator = estimator
+        self.sites = sites
+        self.measured = measured
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._source = None
+        self._cache = OrderedDict()
+
+    def _current(self):
+        sites = self.sites()
+        if sites is not self._source:
+            with self._lock:
+                if sites is not self._source:
+                    self._cache.clear()
+                    self._source = sites
+        return sites
+
+    def distance(self, origin, destination):
+        km = float(self.distances([origin], [destination])[0])
+        return None if math.isnan(km) else km
+
+    def distances(self, origins, destinations):
+        # 주소 목록 쌍 → 거리 배열 (사전에 없는 쌍은 NaN)
+        import numpy as np
+        sites = self._current()
+        keys = [(normalize_address(a), normalize_address(b)) for a, b in zip(origins, destinations)]
+        known = {key for key in keys if key[0] in sites and key[1] in sites}
+        found = self.measured(known) if self.measured and known else {}
+        with self._lock:
+            for key in known - found.keys():
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    found[key] = self._cache[key]
+        missing = [key for key in known if key not in found]
+        if missing:
+            km = self.estimator.estimate_many(
+                [[float(v) for v in sites[o]] for o, _ in missing],
+                [[float(v) for v in sites[d]] for _, d in missing],
+            )
+            estimated = dict(zip(missing, km.tolist()))
+            with self._lock:
+                if sites is self._source:
+                    self._cache.update(estimated)
+                    while len(self._cache) > self.max_entries:
+                        self._cache.popitem(last=False)
+            found.update(estimated)
+        return np.array([found.get(key, np.nan) for key in keys], dtype=float)
+
+
+def estimate_pairs(origins, destinations, site_matrix, lookup):
+    # 주소 쌍 목록 → 추정 거리(km) 배열. 사전 사이트 쌍은 행렬, 나머지는 좌표를 아는 쌍만 일괄 추정 (모르면 NaN).
+    # lookup(addresses) → {정규화 주소: (x, y)} 는 네트워크 호출 없이 로컬 자료만 조회해야 함
+    import numpy as np
+    km = site_matrix.distances(origins, destinations)
+    todo = np.flatnonzero(np.isnan(km))
+    if len(todo):
+        coords = lookup([origins[i] for i in todo] + [destinations[i] for i in todo])
+        pairs = []
+        for i in todo:
+            o, d = coords.get(normalize_address(origins[i])), coords.get(normalize_address(destinations[i]))
+            if o and d:
+                pairs.append((i, o, d))
+        if pairs:
+            km[[i for i, _, _ in pairs]] = site_matrix.estimator.estimate_many([o for _, o, _ in pairs], [d for _, _, d in pairs])
+    return km
@@ -0,0 +1,70 @@
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+# 거리 계산 대기 중인 출장 행의 distance 값
+DISTANCE_PENDING = '계산 중'
+DISTANCE_FAILED = '거리 계산 실패'
+
+# [보안 4] CSV Injection 방지용 접두어
+FORMULA_PREFIXES = ('=', '+', '-', '@')
+
+
+def escape_formula(value):
+    return "'" + value if value.startswith(FORMULA_PREFIXES) else value
+
+
+def unescape_formula(value):
+    return value[1:] if value.startswith("'") and value[1:].startswith(FORMULA_PREFIXES) else value
+
+
+def distance_state(distance):
+    if distance == DISTANCE_PENDING:
+        return 'pending'
+    if '실패' in distance:
+        return 'failed'
+    return 'done'
+
+
+class DistanceQueue:
+    # 출장 신청은 DISTANCE_PENDING 으로 바로 저장하고, 지오코딩/경로 계산은 스레드 풀에서 처리해 행을 갱신
+    def __init__(self, storage, resolve, workers=4):
+        self.storage = storage
+        self.resolve = resolve
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='distance')
+        self._lock = threading.Lock()
+        self._in_flight = set()
+
+    def submit(self, kind, trip):
+        key = (kind, trip[0], trip[1], trip[4], trip[7])
+        with self._lock:
+            if key in self._in_flight:
+                return False
+            self._in_flight.add(key)
+        self._executor.submit(self._run, kind, trip, key)
+        return True
+
+    def in_flight(self, kind, trip):
+        with self._lock:
+            return (kind, trip[0], trip[1], trip[4], trip[7]) in self._in_flight
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._in_flight)
+
+    def _run(self, kind, trip, key):
+        try:
+            try:
+                distance = self.resolve(unescape_formula(trip[4]), unescape_formula(trip[7]))
+            except Exception:
+                traceback.print_exc()
+                distance = DISTANCE_FAILED
+            self.storage.set_trip_distance(kind, trip, distance)
+        except Exception:
+            traceback.print_exc()
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
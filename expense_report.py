@@ -0,0 +1,125 @@
+import io
+import os
+import re
+import threading
+import time
+import zipfile
+
+from werkzeug.utils import secure_filename
+
+from storage import parse_distance_km
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# travel.xlsx 양식의 입력 셀
+CELL_MAP = {
+    'trip_date': 'C10',
+    'location': 'C11',
+    'transport': 'C12',
+    'car_number': 'C13',
+    'purpose': 'B17',
+    'origin': 'C28',
+    'destination': 'E28',
+    'toll_fee': 'G28',
+    'distance': 'I28',
+}
+
+
+def trip_values(trip):
+    # 저장된 출장 행 → 양식 값 (거리는 저장된 값 재사용, 통행료는 미저장이므로 0)
+    return {
+        'trip_date': trip[2],
+        'location': trip[7],
+        'transport': "차량",
+        'car_number': trip[5],
+        'purpose': trip[6],
+        'origin': trip[4],
+        'destination': trip[7],
+        'toll_fee': 0,
+        'distance': parse_distance_km(trip[8]),
+    }
+
+
+INVALID_SHEET_CHARS = re.compile(r'[][:*?/\\]')
+
+
+def _sheet_title(index, trip_date):
+    return f"{index:03d}_{INVALID_SHEET_CHARS.sub('', trip_date or '')}"[:31]
+
+
+class ExpenseTemplate:
+    # 양식 파일을 메모리에 보관 (mtime 변경 시 재적재), 요청마다 복제 후 셀만 채워 BytesIO 로 반환
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = None
+        self._mtime = None
+
+    def _template_bytes(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        if self._data is None or mtime != self._mtime:
+            with self._lock:
+                with open(self.path, 'rb') as f:
+                    self._data = f.read()
+                self._mtime = mtime
+        return self._data
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def workbook(self):
+        # openpyxl Workbook 은 deepcopy 시 스타일 테이블이 깨지므로 캐시된 바이트에서 다시 파싱
+        # (openpyxl 은 import 비용이 커서 경비 양식을 처음 만들 때 불러옴)
+        from openpyxl import load_workbook
+        return load_workbook(io.BytesIO(self._template_bytes()))
+
+    def fill(self, ws, values):
+        for field, cell in CELL_MAP.items():
+            if field in values:
+                ws[cell].value = values[field]
+
+    def render(self, values):
+        wb = self.workbook()
+        self.fill(wb.active, values)
+        output = io.BytesIO()
+        wb.save(output)
+        output.seek(0)
+        return output
+
+    def render_batch(self, output_path, trips_by_user, layout='employee', skipped=()):
+        # layout='employee': 사원별 통합문서 1개 + 출장별 시트, layout='trip': 출장별 통합문서
+        # skipped: 거리가 확정되지 않아 제외한 출장 (결과 메타데이터에 목록으로 남김)
+        start = time.perf_counter()
+        reports = 0
+        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_STORED) as zf:
+            for n, (user_id, trips) in enumerate(trips_by_user.items(), 1):
+                safe_user = secure_filename(user_id) or f'user{n}'
+                if layout == 'trip':
+                    for i, trip in enumerate(trips, 1):
+                        name = f"{safe_user}/expense_report_{safe_user}_{secure_filename(trip[2])}_{i:03d}.xlsx"
+                        zf.writestr(name, self.render(trip_values(trip)).getvalue())
+                        reports += 1
+                    continue
+
+                wb = self.workbook()
+                base = wb.active
+                for i, trip in enumerate(trips, 1):
+                    ws = wb.copy_worksheet(base)
+                    ws.title = _sheet_title(i, trip[2])
+                    self.fill(ws, trip_values(trip))
+                    reports += 1
+                wb.remove(base)
+                output = io.BytesIO()
+                wb.save(output)
+                zf.writestr(f"expense_report_{safe_user}.xlsx", output.getvalue())
+        elapsed = time.perf_counter() - start
+        return {
+            'reports': reports,
+            'employees': len(trips_by_user),
+            'seconds': round(elapsed, 3),
+            'reports_per_sec': round(reports / elapsed, 1) if elapsed > 0 else None,
+            'skipped': [
+                {'user_id': trip[0], 'trip_date': trip[2], 'origin': trip[4], 'destination': trip[7], 'distance': trip[8]}
+                for trip in skipped
+            ],
+        }
@@ -0,0 +1,141 @@
+import bisect
+import csv
+import io
+import os
+import threading
+import time
+
+from file_lock import FileLock
+from geo_cache import normalize_address
+
+GAZETTEER_FIELDS = ['name', 'x', 'y', 'aliases']
+
+
+def _parse_rows(rows):
+    # name,x,y[,aliases] 행 → {정규화 이름: (표시 이름, x, y, 별칭 목록)}, 잘못된 행 수
+    entries = {}
+    skipped = 0
+    for row in rows:
+        name = (row.get('name') or '').strip()
+        x, y = (row.get('x') or '').strip(), (row.get('y') or '').strip()
+        try:
+            float(x), float(y)
+        except ValueError:
+            skipped += 1
+            continue
+        if not normalize_address(name):
+            skipped += 1
+            continue
+        aliases = [a.strip() for a in (row.get('aliases') or '').split('|') if a.strip()]
+        entries[normalize_address(name)] = (name, x, y, aliases)
+    return entries, skipped
+
+
+class Gazetteer:
+    # 회사 사업장/IC/자주 쓰는 주소 → 좌표 로컬 사전. Kakao 호출 전에 조회.
+    # 좌표는 정규화 이름(대소문자/공백 무시) 완전 일치로만 사용하고, 접두어 색인은 입력 자동완성에 사용.
+    # 파일이 다른 워커에서 교체되면 check_interval 마다 mtime 을 확인해 다시 읽음
+    def __init__(self, path='gazetteer.csv', builtin=None, check_interval=1.0):
+        self.path = path
+        self.builtin = builtin or {}
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        # 가져오기(읽기-병합-교체)는 워커 간에도 직렬화해야 다른 워커의 가져오기 결과를 덮어쓰지 않음
+        self._file_lock = FileLock(f'{path}.lock')
+        self._stamp = None
+        self._checked_at = 0.0
+        # (항목, 정규화 이름/별칭 → 좌표, 정렬된 키) 를 한 번에 교체해 조회 중 일관성 유지
+        self._state = ({}, {}, [])
+        self._load()
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _read_file(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8-sig', newline='') as f:
+                return _parse_rows(csv.DictReader(f))[0]
+        except FileNotFoundError:
+            return {}
+
+    def _load(self):
+        stamp = self._file_stamp()
+        entries = {normalize_address(name): (name, xy['x'], xy['y'], []) for name, xy in self.builtin.items()}
+        entries.update(self._read_file())
+        index = {}
+        for key, (name, x, y, aliases) in entries.items():
+            index[key] = (x, y)
+            for alias in aliases:
+                index.setdefault(normalize_address(alias), (x, y))
+        self._state = (entries, index, sorted(index))
+        self._stamp = stamp
+        self._checked_at = time.monotonic()
+
+    def _refresh(self):
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            if self._file_stamp() != self._stamp:
+                self._load()
+            else:
+                self._checked_at = time.monotonic()
+
+    @staticmethod
+    def _prefix_matches(keys, prefix, limit):
+        i = bisect.bisect_left(keys, prefix)
+        matches = []
+        while i < len(keys) and keys[i].startswith(prefix) and len(matches) < limit:
+            matches.append(keys[i])
+            i += 1
+        return matches
+
+    def lookup(self, address):
+        key = normalize_address(address)
+        if not key:
+            return None
+        self._refresh()
+        # 접두어만 같은 항목은 사용하지 않음 (예: '서울' 을 '서울IC' 좌표로 계산하지 않도록)
+        return self._state[1].get(key)
+
+    def sites(self):
+        # 정규화 이름/별칭 → (x, y). 다시 읽을 때마다 새 dict 로 교체되므로 동일성으로 변경 감지 가능
+        self._refresh()
+        return self._state[1]
+
+    def search(self, prefix, limit=10):
+        key = normalize_address(prefix)
+        if not key:
+            return []
+        self._refresh()
+        entries, _, keys = self._state
+        names = []
+        for match in self._prefix_matches(keys, key, limit):
+            # 별칭은 정규화된 형태 그대로 제안 (그대로 입력해도 완전 일치)
+            names.append(entries[match][0] if match in entries else match)
+        return names
+
+    def import_csv(self, data, replace=False):
+        # 업로드된 CSV(bytes/str)를 기존 사전에 병합 (replace=True 면 교체) 후 원자적으로 저장
+        if isinstance(data, bytes):
+            data = data.decode('utf-8-sig')
+        reader = csv.DictReader(io.StringIO(data))
+        if not reader.fieldnames or any(f not in reader.fieldnames for f in ('name', 'x', 'y')):
+            raise ValueError('CSV 형식이 올바르지 않습니다. 필요한 컬럼: name, x, y (선택: aliases)')
+        imported, skipped = _parse_rows(reader)
+
+        with self._file_lock, self._lock:
+            entries = {} if replace else self._read_file()
+            entries.update(imported)
+            tmp_path = f'{self.path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(GAZETTEER_FIELDS)
+                for name, x, y, aliases in entries.values():
+                    writer.writerow([name, x, y, '|'.join(aliases)])
+            os.replace(tmp_path, self.path)
+            self._load()
+        return {'imported': len(imported), 'skipped': skipped, 'total': len(self._state[0])}
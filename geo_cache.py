@@ -0,0 +1,157 @@
+import re
+import threading
+import time
+
+from sqlite_conn import LocalConnection
+
+
+def normalize_address(address):
+    # IC_COORDINATES 조회와 같은 규칙: 대소문자/공백 무시
+    return re.sub(r'\s+', '', address or '').lower()
+
+
+class GeoCache:
+    # 주소 → 좌표, (출발지, 도착지, 우선순위) → 거리(km) 캐시.
+    # SQLite 파일에 저장하므로 gunicorn 재시작 후에도 유지되고 워커 간에 공유된다.
+    def __init__(self, path='geo_cache.db', ttl=30 * 24 * 3600, max_entries=10000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._connection = LocalConnection(path, timeout=10)
+        self._stats_lock = threading.Lock()
+        self._stats = {'coord_hits': 0, 'coord_misses': 0, 'distance_hits': 0, 'distance_misses': 0}
+        self._init_schema()
+
+    def _conn(self):
+        return self._connection.get()
+
+    def _init_schema(self):
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS coordinates ('
+                'address TEXT PRIMARY KEY, x TEXT NOT NULL, y TEXT NOT NULL, '
+                'created_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS distances ('
+                'origin TEXT NOT NULL, destination TEXT NOT NULL, priority TEXT NOT NULL, '
+                'distance_km REAL NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL, '
+                'PRIMARY KEY (origin, destination, priority))'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_coordinates_accessed ON coordinates (accessed_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_distances_accessed ON distances (accessed_at)')
+
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def _evict(self, conn, table):
+        # LRU: 최근 접근 시각이 가장 오래된 항목부터 삭제
+        (count,) = conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()
+        if count > self.max_entries:
+            conn.execute(
+                f'DELETE FROM {table} WHERE rowid IN '
+                f'(SELECT rowid FROM {table} ORDER BY accessed_at LIMIT ?)',
+                (count - self.max_entries,),
+            )
+
+    def get_coordinates(self, address):
+        key = normalize_address(address)
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute('SELECT x, y, created_at FROM coordinates WHERE address = ?', (key,)).fetchone()
+        if row is None or now - row[2] > self.ttl:
+            self._count('coord_misses')
+            return None
+        with conn:
+            conn.execute('UPDATE coordinates SET accessed_at = ? WHERE address = ?', (now, key))
+        self._count('coord_hits')
+        return row[0], row[1]
+
+    def set_coordinates(self, address, x, y):
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO coordinates (address, x, y, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)',
+                (normalize_address(address), str(x), str(y), now, now),
+            )
+            self._evict(conn, 'coordinates')
+
+    def get_distance(self, origin, destination, priority='DISTANCE'):
+        key = (normalize_address(origin), normalize_address(destination), priority)
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            'SELECT distance_km, created_at FROM distances WHERE origin = ? AND destination = ? AND priority = ?',
+            key,
+        ).fetchone()
+        if row is None or now - row[1] > self.ttl:
+            self._count('distance_misses')
+            return None
+        with conn:
+            conn.execute(
+                'UPDATE distances SET accessed_at = ? WHERE origin = ? AND destination = ? AND priority = ?',
+                (now,) + key,
+            )
+        self._count('distance_hits')
+        return row[0]
+
+    def set_distance(self, origin, destination, distance_km, priority='DISTANCE'):
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO distances '
+                '(origin, destination, priority, distance_km, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (normalize_address(origin), normalize_address(destination), priority, float(distance_km), now, now),
+            )
+            self._evict(conn, 'distances')
+
+    def peek_coordinates(self, addresses):
+        # 일괄 조회용: 통계/접근 시각을 건드리지 않고 {정규화 주소: (x, y)} 반환
+        keys = list({normalize_address(a) for a in addresses})
+        cutoff = time.time() - self.ttl
+        found = {}
+        conn = self._conn()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            cur = conn.execute(
+                f'SELECT address, x, y FROM coordinates WHERE created_at >= ? AND address IN ({", ".join("?" * len(chunk))})',
+                [cutoff] + chunk,
+            )
+            found.update((address, (x, y)) for address, x, y in cur)
+        return found
+
+    def peek_distances(self, pairs, priority='DISTANCE'):
+        # 일괄 조회용: 통계/접근 시각을 건드리지 않고 캐시에 있는 실측 거리만 {(정규화 출발지, 정규화 도착지): km} 반환
+        wanted = {(normalize_address(origin), normalize_address(destination)) for origin, destination in pairs}
+        origins = list({origin for origin, _ in wanted})
+        cutoff = time.time() - self.ttl
+        found = {}
+        conn = self._conn()
+        for start in range(0, len(origins), 500):
+            chunk = origins[start:start + 500]
+            cur = conn.execute(
+                'SELECT origin, destination, distance_km FROM distances '
+                f'WHERE priority = ? AND created_at >= ? AND origin IN ({", ".join("?" * len(chunk))})',
+                [priority, cutoff] + chunk,
+            )
+            found.update(((origin, destination), km) for origin, destination, km in cur if (origin, destination) in wanted)
+        return found
+
+    def purge_expired(self):
+        cutoff = time.time() - self.ttl
+        conn = self._conn()
+        with conn:
+            conn.execute('DELETE FROM coordinates WHERE created_at < ?', (cutoff,))
+            conn.execute('DELETE FROM distances WHERE created_at < ?', (cutoff,))
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        conn = self._conn()
+        stats['coord_entries'] = conn.execute('SELECT COUNT(*) FROM coordinates').fetchone()[0]
+        stats['distance_entries'] = conn.execute('SELECT COUNT(*) FROM distances').fetchone()[0]
+        return stats
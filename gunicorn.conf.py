@@ -0,0 +1,32 @@
+# gunicorn 설정: gunicorn -c gunicorn.conf.py app:app
+# 앱을 마스터에서 한 번만 불러오고(preload_app) 무거운 모듈도 미리 import 해 둔 뒤 fork 하므로
+# 워커는 기동 즉시 요청을 받고, 불러온 모듈의 메모리는 워커 간 copy-on-write 로 공유됨
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+preload_app = True
+
+# 요청 대부분이 CSV/SQLite 입출력이나 Kakao API 대기이므로 프로세스 수는 CPU 수 정도로 두고 스레드로 동시성 확보
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', min(multiprocessing.cpu_count() + 1, 8)))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+# 근태 엑셀 업로드/경비 일괄 출력이 수십 초 걸릴 수 있음
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+# 누수 대비 주기적 워커 교체 (동시에 재시작하지 않도록 jitter)
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = 200
+
+accesslog = '-'
+
+# app.py 는 기동 시간을 줄이려고 pandas/openpyxl/numpy/requests 를 기능을 처음 쓸 때 불러옴.
+# preload 시에는 마스터에서 미리 불러와 두어 워커마다 첫 요청에서 다시 불러오지 않도록 함
+PRELOAD_MODULES = ['attendance', 'openpyxl', 'numpy', 'requests', 'urllib3.util.retry']
+
+
+def when_ready(server):
+    if os.getenv('GUNICORN_PRELOAD_MODULES', '1') == '1':
+        for name in PRELOAD_MODULES:
+            __import__(name)
@@ -0,0 +1,100 @@
+import gzip
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from markupsafe import Markup
+from werkzeug.http import is_resource_modified
+
+try:
+    import brotli
+except ImportError:
+    # 선택 의존성: 없으면 gzip 만 사용
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ('text/html', 'text/plain', 'text/css', 'text/javascript', 'application/javascript', 'application/json')
+
+
+def make_etag(*parts):
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:24]
+
+
+def build_stamp(directories, suffixes=('.py', '.html')):
+    # 배포된 코드/템플릿의 최종 수정 시각: 화면 모양이 바뀌면 데이터가 그대로여도 ETag 가 달라지도록
+    latest = 0
+    for directory in directories:
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.endswith(suffixes):
+                latest = max(latest, entry.stat().st_mtime_ns)
+    return latest
+
+
+def _last_modified(timestamp):
+    # HTTP 날짜는 초 단위라 방금(1초 이내) 바뀐 데이터는 If-Modified-Since 로 구분할 수 없으므로 생략
+    if timestamp is None or time.time() - timestamp < 1:
+        return None
+    return datetime.fromtimestamp(int(timestamp), timezone.utc)
+
+
+def not_modified(request, etag, last_modified=None):
+    # If-None-Match(약한 비교) / If-Modified-Since 가 현재 버전과 같으면 True
+    return not is_resource_modified(request.environ, etag=etag, last_modified=_last_modified(last_modified))
+
+
+def set_validators(response, etag, last_modified=None):
+    # gzip/br 로 바뀌어도 같은 ETag 를 쓰므로 약한 ETag. 매번 재검증하도록 no-cache (세션별 화면이라 private)
+    response.set_etag(etag, weak=True)
+    modified = _last_modified(last_modified)
+    if modified is not None:
+        response.last_modified = modified
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Cookie')
+    return response
+
+
+def compress_response(response, accept_encodings, min_size=1024, level=6):
+    # 큰 HTML/JSON 응답을 br(설치된 경우) 또는 gzip 으로 압축. 스트리밍 응답(엑셀 등)은 그대로 전송
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < min_size:
+        return response
+    if brotli is not None and accept_encodings['br']:
+        data, encoding = brotli.compress(data, quality=min(level, 11)), 'br'
+    elif accept_encodings['gzip']:
+        data, encoding = gzip.compress(data, compresslevel=level, mtime=0), 'gzip'
+    else:
+        return response
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+class FragmentCache:
+    # 렌더링한 HTML 조각을 키별로 마지막 버전 하나만 보관 (LRU). 버전이 같으면 다시 렌더링하지 않음
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def get(self, key, version, render):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry[1]
+            self.stats['misses'] += 1
+        html = Markup(render())
+        with self._lock:
+            self._entries[key] = (version, html)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return html
@@ -0,0 +1,103 @@
+import json
+import os
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _process_alive(pid):
+    if os.name == 'nt':
+        # Windows 의 os.kill 은 신호 0 이어도 프로세스를 종료하므로 확인하지 않음
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobStore:
+    # 백그라운드 작업 실행기. 상태/결과를 파일로 남기므로 어느 gunicorn 워커에서든 조회 가능
+    def __init__(self, directory='jobs', workers=2, ttl=24 * 3600):
+        self.directory = os.path.abspath(directory)
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        os.makedirs(self.directory, exist_ok=True)
+        self.fail_orphans()
+
+    def _status_path(self, job_id):
+        return os.path.join(self.directory, f'{job_id}.json')
+
+    def result_path(self, job_id, suffix='.zip'):
+        return os.path.join(self.directory, f'{job_id}{suffix}')
+
+    def _write_status(self, job_id, status):
+        tmp_path = self._status_path(job_id) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(status, f, ensure_ascii=False)
+        os.replace(tmp_path, self._status_path(job_id))
+
+    def submit(self, fn, *args, suffix='.zip'):
+        # fn(output_path, *args) 가 결과 파일을 쓰고 메타데이터 dict 를 반환
+        self.cleanup()
+        job_id = uuid.uuid4().hex
+        status = {'state': 'running', 'created': time.time(), 'suffix': suffix, 'pid': os.getpid()}
+        self._write_status(job_id, status)
+
+        def run():
+            try:
+                meta = fn(self.result_path(job_id, suffix), *args)
+                status.update(state='done', meta=meta or {})
+            except Exception as e:
+                traceback.print_exc()
+                status.update(state='failed', error=str(e))
+            status['finished'] = time.time()
+            self._write_status(job_id, status)
+
+        self._executor.submit(run)
+        return job_id
+
+    def _read_status(self, job_id):
+        try:
+            with open(self._status_path(job_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _orphaned(self, status):
+        # 실행 중인 워커가 재시작(max_requests 등)되면 작업 스레드도 사라져 'running' 으로 남음
+        return status['state'] == 'running' and 'pid' in status and not _process_alive(status['pid'])
+
+    def _fail(self, job_id, status):
+        status.update(state='failed', error='작업을 실행하던 프로세스가 종료되었습니다. 다시 요청해 주세요.', finished=time.time())
+        self._write_status(job_id, status)
+
+    def status(self, job_id):
+        if not job_id.isalnum():
+            return None
+        status = self._read_status(job_id)
+        if status is not None and self._orphaned(status):
+            self._fail(job_id, status)
+        return status
+
+    def fail_orphans(self):
+        # 기동 시 이전 프로세스에서 끝나지 못한 작업을 실패로 표시
+        for name in os.listdir(self.directory):
+            job_id, ext = os.path.splitext(name)
+            if ext == '.json' and job_id.isalnum():
+                status = self._read_status(job_id)
+                if status is not None and self._orphaned(status):
+                    self._fail(job_id, status)
+
+    def cleanup(self):
+        cutoff = time.time() - self.ttl
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,85 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+LOCAL_BASE_URL = 'https://dapi.kakao.com'
+NAVI_BASE_URL = 'https://apis-navi.kakaomobility.com'
+
+
+class KakaoClient:
+    # Kakao 주소검색/길찾기 API 공용 클라이언트 (keep-alive 세션 + 429/5xx 재시도)
+    def __init__(self, api_key, local_base_url=LOCAL_BASE_URL, navi_base_url=NAVI_BASE_URL,
+                 pool_size=10, max_retries=2, backoff_factor=0.3, timeout=5, workers=4):
+        self.api_key = api_key
+        self.local_base_url = local_base_url.rstrip('/')
+        self.navi_base_url = navi_base_url.rstrip('/')
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self._lock = threading.Lock()
+        self._session = None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='kakao')
+
+    @property
+    def session(self):
+        # requests 는 import 비용이 커서 첫 API 호출 때 불러와 세션 생성
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    from urllib3.util.retry import Retry
+
+                    session = requests.Session()
+                    session.headers['Authorization'] = f'KakaoAK {self.api_key}'
+                    retry = Retry(
+                        total=self.max_retries,
+                        backoff_factor=self.backoff_factor,
+                        status_forcelist=(429, 500, 502, 503, 504),
+                        allowed_methods=frozenset(['GET']),
+                        respect_retry_after_header=True,
+                        raise_on_status=False,
+                    )
+                    adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+        return self._session
+
+    def _get(self, url, params):
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        if response.status_code != 200:
+            return None
+        return response.json()
+
+    def geocode(self, address):
+        try:
+            data = self._get(f'{self.local_base_url}/v2/local/search/address.json', {'query': address})
+            if data and data['documents']:
+                return data['documents'][0]['x'], data['documents'][0]['y']
+        except Exception as e:
+            print(f"API Error: {e}")
+        return None, None
+
+    def directions(self, origin_xy, destination_xy, priority='DISTANCE'):
+        params = {
+            'origin': f'{origin_xy[0]},{origin_xy[1]}',
+            'destination': f'{destination_xy[0]},{destination_xy[1]}',
+            'priority': priority,
+        }
+        try:
+            data = self._get(f'{self.navi_base_url}/v1/directions', params)
+            if data:
+                return data['routes'][0]['summary']['distance'] / 1000
+        except Exception as e:
+            print(f"API Error: {e}")
+        return None
+
+    def map(self, fn, items):
+        # 출발지/도착지 지오코딩처럼 서로 독립적인 호출을 동시에 실행
+        return list(self._executor.map(fn, items))
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        if self._session is not None:
+            self._session.close()
@@ -0,0 +1,112 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels, extra=None):
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in items) + '}'
+
+
+class Metrics:
+    # 프로세스 단위 카운터/히스토그램 레지스트리, Prometheus 텍스트 형식으로 출력.
+    # gunicorn 워커마다 따로 집계되며 출력에는 응답한 워커의 값만 포함된다 (pid 라벨로 구분)
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+        self._collectors = []
+
+    def describe(self, name, text):
+        self._help[name] = text
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    hist[0][i] += 1
+                    break
+            hist[1] += value
+            hist[2] += 1
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(f'{name}_seconds', time.perf_counter() - start, **labels)
+
+    def timed(self, name, **labels):
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def instrument(self, obj, name, methods, label='method'):
+        # 객체의 메서드를 타이머로 감쌈 (예: storage 의 CSV 읽기/재작성 시간)
+        for method in methods:
+            if hasattr(obj, method):
+                setattr(obj, method, self.timed(name, **{label: method})(getattr(obj, method)))
+        return obj
+
+    def register_collector(self, fn):
+        # fn() → [(이름, 라벨 dict, 값), ...] 를 출력 시점에 gauge 로 추가 (캐시 적중률 등)
+        self._collectors.append(fn)
+
+    def render(self, **const_labels):
+        const = tuple(sorted(const_labels.items()))
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (list(h[0]), h[1], h[2]) for key, h in self._histograms.items()}
+        lines = []
+        seen = set()
+
+        def header(name, kind):
+            if name not in seen:
+                seen.add(name)
+                if name in self._help:
+                    lines.append(f'# HELP {name} {self._help[name]}')
+                lines.append(f'# TYPE {name} {kind}')
+
+        for (name, labels), value in sorted(counters.items()):
+            header(name, 'counter')
+            lines.append(f'{name}{_labels(const + labels)} {value}')
+        for (name, labels), (counts, total, count) in sorted(histograms.items()):
+            header(name, 'histogram')
+            labels = const + labels
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{_labels(labels, ("le", bound))} {cumulative}')
+            lines.append(f'{name}_bucket{_labels(labels, ("le", "+Inf"))} {count}')
+            lines.append(f'{name}_sum{_labels(labels)} {total}')
+            lines.append(f'{name}_count{_labels(labels)} {count}')
+        for collector in self._collectors:
+            for name, labels, value in collector():
+                header(name, 'gauge')
+                lines.append(f'{name}{_labels(const + tuple(sorted(labels.items())))} {value}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,22 @@
+import os
+import sqlite3
+import threading
+
+
+class LocalConnection:
+    # 스레드별 WAL 모드 SQLite 연결.
+    # gunicorn preload_app 으로 fork 된 워커는 마스터에서 연 연결을 쓰지 않고 새로 연결
+    def __init__(self, path, timeout=10):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def get(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
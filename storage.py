@@ -0,0 +1,958 @@
+import csv
+import heapq
+import io
+import os
+import re
+import threading
+
+from file_lock import FileLock
+from sqlite_conn import LocalConnection
+
+TRIP_KINDS = ('local', 'outdoor')
+TRIP_FIELDS = ['user_id', 'submit_time', 'trip_date', 'departure_time', 'origin', 'car_number', 'purpose', 'destination', 'distance']
+USER_FIELDS = ['user_id', 'username', 'password', 'department', 'workplace', 'position', 'email', 'register_date']
+ATTENDANCE_COLUMNS = ['사원번호', '이름', '부서', '출근시간', '퇴근시간', '날짜', '결재상태', '근무지', '비고']
+APPROVAL_COLUMNS = ['사원번호', '날짜', '상태']
+
+# 월별 출장 합계 journal (trip_summary.csv) 컬럼: 증감 행을 이어 붙이고 주기적으로 합계 행으로 압축
+SUMMARY_FIELDS = ['kind', 'user_id', 'month', 'trips', 'km']
+
+DISTANCE_PATTERN = re.compile(r'\s*(\d+(?:\.\d+)?)\s*(?:km)?\s*(?:\(추정\))?\s*$')
+
+# SQLite 컬럼명 ↔ attendance.csv 헤더
+ATTENDANCE_SQL_COLUMNS = dict(zip(ATTENDANCE_COLUMNS, ['employee_id', 'name', 'department', 'check_in', 'check_out', 'date', 'status', 'workplace', 'remark']))
+
+
+def _read_rows(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return list(csv.reader(f))
+    except FileNotFoundError:
+        return []
+
+
+def _tail_csv(path, position):
+    # position=(inode, offset, 마지막으로 읽은 끝부분) 이후에 추가된 완결된 행만 읽음 → (행 목록, 새 position).
+    # 파일이 교체/축소됐으면 행 목록 대신 None (처음부터 다시 읽어야 함). 교체된 파일이 지워진 파일의
+    # inode 를 재사용할 수 있으므로 이전에 읽은 끝부분이 그대로인지도 확인
+    inode, offset, tail = position
+    try:
+        with open(path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            if inode is not None and (st.st_ino != inode or st.st_size < offset):
+                return None, position
+            f.seek(offset - len(tail))
+            if f.read(len(tail)) != tail:
+                return None, position
+            data = f.read()
+    except FileNotFoundError:
+        return (None if inode is not None else []), position
+    end = data.rfind(b'\n') + 1
+    tail = (tail + data[:end])[-64:]
+    return list(csv.reader(io.StringIO(data[:end].decode('utf-8')))), (st.st_ino, offset + end, tail)
+
+
+def _file_stamps(paths):
+    # 파일별 (inode, mtime, 크기): 재작성/추가 시 바뀜 (없는 파일은 None)
+    stamps = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            stamps.append((st.st_ino, st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            stamps.append(None)
+    return tuple(stamps)
+
+
+def _last_modified(paths):
+    # 가장 최근 수정 시각 (epoch 초), 파일이 하나도 없으면 None
+    times = [stamp[1] / 1e9 for stamp in _file_stamps(paths) if stamp]
+    return max(times) if times else None
+
+
+def _write_rows(path, rows, fsync=False):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows(rows)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _replace_rows(path, rows, fsync=False):
+    # 임시 파일에 다 쓴 뒤 교체: 읽는 쪽은 이전 또는 새 파일 전체만 보게 됨
+    tmp_path = f'{path}.tmp'
+    _write_rows(tmp_path, rows, fsync)
+    os.replace(tmp_path, path)
+
+
+def _append_rows(path, rows, header=None, fsync=False):
+    new_file = header is not None and not os.path.exists(path)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if new_file:
+        writer.writerow(header)
+    writer.writerows(rows)
+    # 한 번의 write 로 기록해 다른 프로세스가 중간에 끼어든 행을 남기지 않도록 함
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        f.write(buffer.getvalue())
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class _GroupAppender:
+    # 같은 프로세스의 동시 append 요청을 모아 잠금 1회 + write 1회로 기록 (group commit).
+    # 먼저 leader 잠금을 잡은 스레드가 그때까지 쌓인 요청을 모두 기록하고 나머지는 완료만 확인
+    def __init__(self, path, lock, fsync=False, on_write=None):
+        self.path = path
+        self.lock = lock
+        self.fsync = fsync
+        # 기록한 행 목록으로 잠금 안에서 호출 (파생 데이터 갱신용)
+        self.on_write = on_write
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._leader_lock = threading.Lock()
+
+    def append(self, rows, header=None):
+        entry = {'rows': rows, 'header': header, 'done': False, 'error': None}
+        with self._pending_lock:
+            self._pending.append(entry)
+        with self._leader_lock:
+            if not entry['done']:
+                with self._pending_lock:
+                    batch, self._pending = self._pending, []
+                error = None
+                try:
+                    rows = [row for item in batch for row in item['rows']]
+                    with self.lock:
+                        _append_rows(
+                            self.path,
+                            rows,
+                            header=next((item['header'] for item in batch if item['header']), None),
+                            fsync=self.fsync,
+                        )
+                        if self.on_write:
+                            self.on_write(rows)
+                except Exception as e:
+                    error = e
+                for item in batch:
+                    item['error'] = error
+                    item['done'] = True
+        if entry['error'] is not None:
+            raise entry['error']
+
+
+def _cell(value):
+    return '' if value is None else value
+
+
+def parse_distance_km(value):
+    # 저장 형식 "12.34 km" / "12.34 km (추정)" → 12.34 (실패/미계산은 0)
+    match = DISTANCE_PATTERN.match(str(value))
+    return float(match.group(1)) if match else 0.0
+
+
+def _month(trip_date):
+    return (trip_date or '')[:7]
+
+
+def _trip_deltas(kind, rows, sign=1):
+    # 출장 행 → {(구분, 사원번호, 'YYYY-MM'): [건수 증감, km 증감]}
+    deltas = {}
+    for row in rows:
+        if len(row) < len(TRIP_FIELDS):
+            continue
+        delta = deltas.setdefault((kind, row[0], _month(row[2])), [0, 0.0])
+        delta[0] += sign
+        delta[1] += sign * parse_distance_km(row[8])
+    return deltas
+
+
+def _distance_deltas(kind, rows, sign=1):
+    # 거리 journal 행 → 월별 합계 km 증감 (행: 사원번호, 신청일시, 출발지, 목적지, 거리, 'YYYY-MM', km 증감)
+    deltas = {}
+    for row in rows:
+        if len(row) < 7:
+            continue
+        delta = deltas.setdefault((kind, row[0], row[5]), [0, 0.0])
+        delta[1] += sign * float(row[6])
+    return deltas
+
+
+def encode_cursor(trip, seq):
+    # 키셋 페이지 커서: (신청일시, 사용자ID, 순번). 신청일시는 초 단위라 같은 값이 있을 수 있어
+    # 고유한 순번(SQLite id / CSV 행 번호)으로 구분
+    return f'{trip[1]}|{seq}|{trip[0]}'
+
+
+def decode_cursor(cursor):
+    submit_time, _, rest = cursor.partition('|')
+    seq, _, user_id = rest.partition('|')
+    return submit_time, user_id, int(seq) if seq.isdigit() else -1
+
+
+def _page(rows, limit):
+    # rows: 정렬된 (순번, 출장 행) limit+1 건 → (출장 행 목록, 다음 커서)
+    trips = [trip for _, trip in rows[:limit]]
+    if len(rows) > limit:
+        seq, trip = rows[limit - 1]
+        return trips, encode_cursor(trip, seq)
+    return trips, None
+
+
+class CsvStorage:
+    # 기존 CSV 파일 포맷 그대로 읽고 쓰는 기본 저장소.
+    # 파일별 <파일>.lock 잠금으로 여러 gunicorn 워커의 쓰기를 직렬화 (재작성은 임시 파일 + os.replace)
+    def __init__(self, base_dir='.', compact_threshold=500, fsync=False):
+        self.base_dir = base_dir
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self.users_path = os.path.join(base_dir, 'users.csv')
+        self.trip_paths = {
+            'local': os.path.join(base_dir, 'local_trips.csv'),
+            'outdoor': os.path.join(base_dir, 'outdoor_trips.csv'),
+        }
+        self.attendance_path = os.path.join(base_dir, 'attendance.csv')
+        self.approvals_path = os.path.join(base_dir, 'approvals.csv')
+        self.tombstone_path = os.path.join(base_dir, 'attendance_tombstones.csv')
+        self._attendance_index = _AttendanceIndex(self.attendance_path, self.tombstone_path)
+        # 백그라운드 거리 계산 결과는 출장 파일을 재작성하지 않고 journal 에 추가 (읽을 때 overlay)
+        self.distance_paths = {kind: os.path.join(base_dir, f'{kind}_trip_distances.csv') for kind in self.trip_paths}
+        self._distance_indexes = {kind: _DistanceIndex(path) for kind, path in self.distance_paths.items()}
+        self._users_lock = FileLock(f'{self.users_path}.lock')
+        self._trip_locks = {kind: FileLock(f'{path}.lock') for kind, path in self.trip_paths.items()}
+        # attendance / approvals / tombstone 은 compaction 에서 함께 재작성되므로 잠금 하나로 묶음
+        self._attendance_lock = FileLock(f'{self.attendance_path}.lock')
+        self._trip_appenders = {
+            kind: _GroupAppender(path, self._trip_locks[kind], fsync, on_write=lambda rows, kind=kind: self._add_summary(_trip_deltas(kind, rows)))
+            for kind, path in self.trip_paths.items()
+        }
+        # journal 은 출장 파일과 함께 접히므로 출장 파일 잠금을 같이 사용
+        self._distance_appenders = {
+            kind: _GroupAppender(path, self._trip_locks[kind], fsync, on_write=lambda rows, kind=kind: self._add_summary(_distance_deltas(kind, rows)))
+            for kind, path in self.distance_paths.items()
+        }
+        self._approvals_appender = _GroupAppender(self.approvals_path, self._attendance_lock, fsync)
+        # 월별 합계 journal 은 출장 파일 잠금을 잡은 상태에서 추가로 잠금 (잠금 순서: 출장 → 합계)
+        self.summary_path = os.path.join(base_dir, 'trip_summary.csv')
+        self._summary_lock = FileLock(f'{self.summary_path}.lock')
+        self._summary_index = _SummaryIndex(self.summary_path)
+        if not os.path.exists(self.summary_path) and any(os.path.exists(path) for path in self.trip_paths.values()):
+            # 기존 데이터에 처음 적용할 때 1회 생성
+            self.rebuild_trip_summary()
+
+    # --- data version (HTTP 캐시 검증용) ---
+
+    def data_version(self):
+        # 사용자/출장/근태·결재 파일이 쓰일 때마다 바뀌는 값 (화면별로 필요한 항목만 ETag 에 사용)
+        return {
+            'users': self.users_version(),
+            'trips': _file_stamps([*self.trip_paths.values(), *self.distance_paths.values()]),
+            'attendance': self.attendance_version(),
+        }
+
+    def data_modified(self):
+        return _last_modified([
+            self.users_path, *self.trip_paths.values(), *self.distance_paths.values(), self.attendance_path, self.approvals_path, self.tombstone_path,
+        ])
+
+    # --- users ---
+
+    def users_version(self):
+        try:
+            st = os.stat(self.users_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def list_users(self):
+        return [row for row in _read_rows(self.users_path) if row]
+
+    def upsert_user(self, row):
+        with self._users_lock:
+            users = _read_rows(self.users_path)
+            for i, user in enumerate(users):
+                if user and user[0] == row[0]:
+                    users[i] = list(row)
+                    break
+            else:
+                users.append(list(row))
+            _replace_rows(self.users_path, users, self.fsync)
+
+    def delete_user(self, user_id):
+        with self._users_lock:
+            if not os.path.exists(self.users_path):
+                return
+            users = [user for user in _read_rows(self.users_path) if user and user[0] != user_id]
+            _replace_rows(self.users_path, users, self.fsync)
+
+    # --- trips ---
+
+    def _read_trips(self, kind):
+        # 출장 파일 + 거리 journal overlay. journal 을 먼저 읽어야 그 사이 접혀도 최신 거리가 보임
+        distances = self._distance_indexes[kind].refresh()
+        trips = _read_rows(self.trip_paths[kind])
+        if distances:
+            for row in trips:
+                if len(row) >= len(TRIP_FIELDS):
+                    row[8] = distances.get((row[0], row[1], row[4], row[7]), row[8])
+        return trips
+
+    def _fold_distances(self, kind, trips):
+        # 출장 파일 잠금 안에서 호출: journal 거리를 trips 에 반영 → 반영 여부.
+        # 행이 없어진(삭제된) 출장의 journal 증감은 합계에서 되돌림
+        journal = [row for row in _read_rows(self.distance_paths[kind]) if len(row) >= 7]
+        if not journal:
+            return False
+        latest = {tuple(row[:4]): row[4] for row in journal}
+        found = set()
+        for row in trips:
+            key = (row[0], row[1], row[4], row[7]) if len(row) >= len(TRIP_FIELDS) else None
+            if key in latest:
+                row[8] = latest[key]
+                found.add(key)
+        self._add_summary(_distance_deltas(kind, [row for row in journal if tuple(row[:4]) not in found], sign=-1))
+        return True
+
+    def _clear_distances(self, kind):
+        # 출장 파일을 교체한 뒤에 journal 삭제 (읽는 쪽은 journal → 출장 파일 순서)
+        try:
+            os.remove(self.distance_paths[kind])
+        except FileNotFoundError:
+            pass
+        self._distance_indexes[kind].reset()
+
+    def compact_trips(self, kind):
+        # 거리 journal 을 출장 파일에 접어 넣음 (재작성 1회)
+        path = self.trip_paths[kind]
+        with self._trip_locks[kind]:
+            trips = [trip for trip in _read_rows(path) if trip]
+            if self._fold_distances(kind, trips):
+                _replace_rows(path, trips, self.fsync)
+                self._clear_distances(kind)
+
+    def add_trip(self, kind, row):
+        self._trip_appenders[kind].append([row])
+
+    def add_trips(self, kind, rows):
+        # 여러 행을 잠금 1회 + write 1회로 추가 (일괄 가져오기용)
+        if rows:
+            self._trip_appenders[kind].append([list(row) for row in rows])
+
+    def list_trips(self, kind, user_id=None, trip_date=None):
+        trips = [row for row in self._read_trips(kind) if row]
+        if user_id is not None:
+            trips = [trip for trip in trips if trip[0] == user_id]
+        if trip_date:
+            trips = [trip for trip in trips if trip[2] == trip_date]
+        return trips
+
+    def page_trips(self, kind, user_id=None, start_date=None, end_date=None, cursor=None, limit=50):
+        after = decode_cursor(cursor) if cursor else None
+
+        def match(row):
+            seq, trip = row
+            if not trip or (user_id is not None and trip[0] != user_id):
+                return False
+            if (start_date and trip[2] < start_date) or (end_date and trip[2] > end_date):
+                return False
+            return after is None or (trip[1], trip[0], seq) < after
+
+        # (신청일시, 사용자ID, 행 번호) 내림차순 상위 limit+1 건만 유지 (전체 정렬 없음)
+        rows = heapq.nlargest(limit + 1, filter(match, enumerate(self._read_trips(kind))), key=lambda r: (r[1][1], r[1][0], r[0]))
+        return _page(rows, limit)
+
+    def delete_trip(self, kind, submit_time):
+        path = self.trip_paths[kind]
+        with self._trip_locks[kind]:
+            if not os.path.exists(path):
+                return
+            trips = [trip for trip in _read_rows(path) if trip]
+            removed = [trip for trip in trips if trip[1] == submit_time]
+            if removed:
+                # 어차피 재작성하므로 거리 journal 도 함께 접음
+                folded = self._fold_distances(kind, trips)
+                _replace_rows(path, [trip for trip in trips if trip[1] != submit_time], self.fsync)
+                if folded:
+                    self._clear_distances(kind)
+                self._add_summary(_trip_deltas(kind, removed, sign=-1))
+
+    def find_trips(self, kind, user_id, submit_times):
+        wanted = set(submit_times)
+        return [trip for trip in self._read_trips(kind) if trip and trip[0] == user_id and trip[1] in wanted]
+
+    def set_trip_distance(self, kind, trip, distance):
+        return self.set_trip_distances(kind, [(trip, distance)])
+
+    def set_trip_distances(self, kind, updates):
+        # (사용자, 신청일시, 출발지, 목적지) 가 같은 행의 거리를 journal 에 추가 (출장 파일은 재작성하지 않음).
+        # 합계 증감은 전달된 행의 기존 거리 기준이고, journal 이 compact_threshold 행 이상 쌓이면 출장 파일에 접음
+        rows = [
+            [trip[0], trip[1], trip[4], trip[7], distance, _month(trip[2]),
+             f'{parse_distance_km(distance) - parse_distance_km(trip[8]):.2f}']
+            for trip, distance in updates
+        ]
+        if not rows:
+            return 0
+        self._distance_appenders[kind].append(rows)
+        index = self._distance_indexes[kind]
+        index.refresh()
+        if index.rows >= self.compact_threshold:
+            self.compact_trips(kind)
+        return len(rows)
+
+    # --- 월별 출장 합계 ---
+
+    def _add_summary(self, deltas):
+        rows = [[kind, user_id, month, trips, f'{km:.2f}'] for (kind, user_id, month), (trips, km) in deltas.items() if trips or km]
+        if not rows:
+            return
+        with self._summary_lock:
+            _append_rows(self.summary_path, rows, header=SUMMARY_FIELDS, fsync=self.fsync)
+            index = self._summary_index
+            index.refresh()
+            # 증감 행이 합계 키 수보다 충분히 많아지면 합계 행으로 압축
+            if index.rows >= max(self.compact_threshold, 2 * len(index.totals)):
+                self._write_summary(index.totals)
+
+    def _write_summary(self, totals):
+        rows = [[kind, user_id, month, trips, f'{km:.2f}'] for (kind, user_id, month), (trips, km) in sorted(totals.items()) if trips]
+        _replace_rows(self.summary_path, [SUMMARY_FIELDS] + rows, self.fsync)
+
+    def rebuild_trip_summary(self):
+        # 출장 파일 전체에서 다시 계산 (journal 이 어긋났을 때 복구용)
+        with self._trip_locks['local'], self._trip_locks['outdoor'], self._summary_lock:
+            for kind in self.trip_paths:
+                self.compact_trips(kind)
+            totals = {}
+            for kind, path in self.trip_paths.items():
+                for key, (trips, km) in _trip_deltas(kind, _read_rows(path)).items():
+                    total = totals.setdefault(key, [0, 0.0])
+                    total[0] += trips
+                    total[1] += km
+            self._write_summary(totals)
+            self._summary_index.refresh()
+
+    def trip_summary_version(self):
+        return self._summary_index.refresh()
+
+    def trip_summary(self):
+        # [(구분, 사원번호, 'YYYY-MM', 건수, km)]
+        index = self._summary_index
+        with index.lock:
+            index.refresh()
+            return [(kind, user_id, month, trips, round(km, 2)) for (kind, user_id, month), (trips, km) in index.totals.items() if trips]
+
+    # --- attendance / approvals ---
+    # attendance.csv 는 추가 전용: 삭제는 tombstone 파일에 기록하고 주기적으로 compaction
+
+    def attendance_version(self):
+        return _file_stamps((self.attendance_path, self.approvals_path, self.tombstone_path))
+
+    def list_attendance(self):
+        return list(self.iter_attendance())
+
+    def iter_attendance(self):
+        # 파일을 행 단위로 읽으며 삭제되지 않은 레코드만 반환. 색인 갱신과 파일 열기를 잠금 안에서 해
+        # tombstone 순번이 열린 파일과 일치하도록 함 (그 사이 compaction 방지). 이후 추가/삭제는 반영하지 않음
+        index = self._attendance_index
+        with self._attendance_lock:
+            index.refresh()
+            tombs, limit = dict(index.tombs), index.rows
+            try:
+                f = open(self.attendance_path, 'r', encoding='utf-8')
+            except FileNotFoundError:
+                return
+        with f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not header:
+                return
+            id_idx, date_idx = header.index('사원번호'), header.index('날짜')
+            seq = 0
+            for row in reader:
+                if seq >= limit:
+                    break
+                if not row:
+                    continue
+                if seq >= tombs.get((row[id_idx], row[date_idx]), 0):
+                    yield dict(zip(header, row))
+                seq += 1
+
+    def add_attendance(self, records):
+        index = self._attendance_index
+        with self._attendance_lock:
+            index.refresh()
+            if index.header is not None and any(col not in index.header for col in ATTENDANCE_COLUMNS):
+                # 이전 형식 헤더: 한 번 전체 재작성으로 컬럼 보강
+                self.compact_attendance()
+                index.refresh()
+            header = index.header or ATTENDANCE_COLUMNS
+
+            rows = []
+            seen = set()
+            for record in records:
+                key = (str(record.get('사원번호')), str(record.get('날짜')))
+                if key in seen or index.is_live(key):
+                    continue
+                seen.add(key)
+                rows.append([_cell(record.get(col)) for col in header])
+            if rows:
+                _append_rows(self.attendance_path, rows, header=header, fsync=self.fsync)
+            return len(rows)
+
+    def delete_attendance(self, employee_id, date):
+        index = self._attendance_index
+        with self._attendance_lock:
+            index.refresh()
+            _append_rows(self.tombstone_path, [[employee_id, date, index.rows]], fsync=self.fsync)
+            _append_rows(self.approvals_path, [[employee_id, date, '']], header=APPROVAL_COLUMNS, fsync=self.fsync)
+            if index.tomb_count + 1 >= self.compact_threshold:
+                self.compact_attendance()
+
+    def compact_attendance(self):
+        index = self._attendance_index
+        with self._attendance_lock:
+            index.refresh()
+            rows = _read_rows(self.attendance_path)
+            if rows:
+                header = rows[0] + [col for col in ATTENDANCE_COLUMNS if col not in rows[0]]
+                records = self.list_attendance()
+                _replace_rows(self.attendance_path, [header] + [[_cell(r.get(col)) for col in header] for r in records], self.fsync)
+            approvals = self.load_approvals()
+            if approvals or os.path.exists(self.approvals_path):
+                _replace_rows(self.approvals_path, [APPROVAL_COLUMNS] + [[emp, date, status] for (emp, date), status in approvals.items()], self.fsync)
+            if os.path.exists(self.tombstone_path):
+                os.remove(self.tombstone_path)
+            index.reset()
+
+    def load_approvals(self):
+        approvals = {}
+        for row in _read_rows(self.approvals_path)[1:]:
+            if row[2]:
+                approvals[(row[0], str(row[1]))] = row[2]
+            else:
+                # 상태가 빈 행 = 근태 삭제로 결재 취소
+                approvals.pop((row[0], str(row[1])), None)
+        return approvals
+
+    def add_approvals(self, rows):
+        self._approvals_appender.append([list(row) for row in rows], header=APPROVAL_COLUMNS)
+
+
+class _AttendanceIndex:
+    # attendance.csv 와 tombstone 파일을 마지막으로 읽은 위치부터 이어 읽어
+    # (사원번호, 날짜) → 최신 행 순번, (사원번호, 날짜) → 삭제 시점 행 수 를 유지
+    def __init__(self, path, tombstone_path):
+        self.path = path
+        self.tombstone_path = tombstone_path
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.header = None
+            self.rows = 0
+            self.keys = {}
+            self.tombs = {}
+            self.tomb_count = 0
+            self._positions = {self.path: (None, 0, b''), self.tombstone_path: (None, 0, b'')}
+
+    def _tail(self, path):
+        rows, self._positions[path] = _tail_csv(path, self._positions[path])
+        return rows
+
+    def refresh(self):
+        with self._lock:
+            rows, tombs = self._tail(self.path), self._tail(self.tombstone_path)
+            if rows is None or tombs is None:
+                # compaction 등으로 파일이 교체됨 → 처음부터 다시 색인
+                self.reset()
+                rows, tombs = self._tail(self.path) or [], self._tail(self.tombstone_path) or []
+            for row in rows:
+                if not row:
+                    continue
+                if self.header is None:
+                    self.header = row
+                    self._id_idx, self._date_idx = row.index('사원번호'), row.index('날짜')
+                    continue
+                self.keys[(row[self._id_idx], row[self._date_idx])] = self.rows
+                self.rows += 1
+            for row in tombs:
+                if row:
+                    key = (row[0], row[1])
+                    self.tombs[key] = max(self.tombs.get(key, 0), int(row[2]))
+                    self.tomb_count += 1
+
+    def is_live(self, key):
+        seq = self.keys.get(key)
+        return seq is not None and seq >= self.tombs.get(key, 0)
+
+
+class _DistanceIndex:
+    # 거리 journal 을 마지막으로 읽은 위치부터 이어 읽어 (사원번호, 신청일시, 출발지, 목적지) → 최신 거리 유지
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.distances = {}
+            self.rows = 0
+            self._position = (None, 0, b'')
+
+    def refresh(self):
+        # 현재 overlay 의 복사본 (다른 스레드의 갱신과 무관하게 순회 가능)
+        with self.lock:
+            rows, self._position = _tail_csv(self.path, self._position)
+            if rows is None:
+                # 접혀서 삭제/교체됨 → 처음부터 다시 읽음
+                self.reset()
+                rows, self._position = _tail_csv(self.path, self._position)
+            for row in rows or []:
+                if len(row) >= 7:
+                    self.distances[tuple(row[:4])] = row[4]
+                    self.rows += 1
+            return dict(self.distances)
+
+
+class _SummaryIndex:
+    # trip_summary.csv 를 마지막으로 읽은 위치부터 이어 읽어 (구분, 사원번호, 월) → [건수, km] 합계 유지
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.totals = {}
+            self.rows = 0
+            self._position = (None, 0, b'')
+
+    def refresh(self):
+        # 현재 읽은 위치 (파일이 바뀌었는지 비교하는 버전 값으로도 사용)
+        with self.lock:
+            rows, self._position = _tail_csv(self.path, self._position)
+            if rows is None:
+                self.reset()
+                rows, self._position = _tail_csv(self.path, self._position)
+            for row in rows or []:
+                if not row or row == SUMMARY_FIELDS:
+                    continue
+                total = self.totals.setdefault((row[0], row[1], row[2]), [0, 0.0])
+                total[0] += int(row[3])
+                total[1] += float(row[4])
+                self.rows += 1
+            return self._position
+
+
+def _km_sql(column):
+    # parse_distance_km 의 SQL 버전: 숫자로 시작하는 값만 km 로 (계산 중/실패는 0)
+    return f"(CASE WHEN trim({column}) GLOB '[0-9]*' THEN CAST(trim({column}) AS REAL) ELSE 0 END)"
+
+
+def _summary_sql(row, sign):
+    month = f"substr(coalesce({row}.trip_date, ''), 1, 7)"
+    return (
+        f'INSERT INTO trip_summary (kind, user_id, month, trips, km) '
+        f'VALUES ({row}.kind, {row}.user_id, {month}, {sign}1, {sign}{_km_sql(row + ".distance")}) '
+        f'ON CONFLICT(kind, user_id, month) DO UPDATE SET trips = trips + excluded.trips, km = km + excluded.km;'
+    )
+
+
+_BUMP_SUMMARY = "UPDATE meta SET value = value + 1 WHERE key = 'trip_summary_version';"
+
+# trips 변경 시 같은 트랜잭션 안에서 (구분, 사원번호, 월) 합계를 증감
+TRIP_SUMMARY_TRIGGERS = f"""
+    CREATE TRIGGER IF NOT EXISTS trip_summary_insert AFTER INSERT ON trips BEGIN
+        {_summary_sql('NEW', '+')} {_BUMP_SUMMARY}
+    END;
+    CREATE TRIGGER IF NOT EXISTS trip_summary_delete AFTER DELETE ON trips BEGIN
+        {_summary_sql('OLD', '-')} {_BUMP_SUMMARY}
+    END;
+    CREATE TRIGGER IF NOT EXISTS trip_summary_update AFTER UPDATE OF kind, user_id, trip_date, distance ON trips BEGIN
+        {_summary_sql('OLD', '-')} {_summary_sql('NEW', '+')} {_BUMP_SUMMARY}
+    END;
+"""
+
+
+class SqliteStorage:
+    # WAL 모드 SQLite 저장소: 사용자/날짜/신청일시/(사원번호, 날짜) 인덱스로 조회
+    def __init__(self, path='total.db'):
+        self.path = path
+        self._connection = LocalConnection(path, timeout=30)
+        self._init_schema()
+
+    def _conn(self):
+        return self._connection.get()
+
+    def _init_schema(self):
+        conn = self._conn()
+        with conn:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+                CREATE TABLE IF NOT EXISTS users (
+                    user_id TEXT PRIMARY KEY, username TEXT, password TEXT, department TEXT,
+                    workplace TEXT, position TEXT, email TEXT, register_date TEXT
+                );
+                CREATE TABLE IF NOT EXISTS trips (
+                    id INTEGER PRIMARY KEY, kind TEXT NOT NULL, user_id TEXT NOT NULL, submit_time TEXT NOT NULL,
+                    trip_date TEXT, departure_time TEXT, origin TEXT, car_number TEXT, purpose TEXT,
+                    destination TEXT, distance TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_trips_user ON trips (kind, user_id, submit_time);
+                CREATE INDEX IF NOT EXISTS idx_trips_date ON trips (kind, trip_date);
+                CREATE INDEX IF NOT EXISTS idx_trips_submit ON trips (kind, submit_time);
+                CREATE TABLE IF NOT EXISTS attendance (
+                    id INTEGER PRIMARY KEY, employee_id TEXT NOT NULL, name TEXT, department TEXT,
+                    check_in TEXT, check_out TEXT, date TEXT NOT NULL, status TEXT, workplace TEXT, remark TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_attendance_key ON attendance (employee_id, date);
+                CREATE TABLE IF NOT EXISTS approvals (
+                    employee_id TEXT NOT NULL, date TEXT NOT NULL, status TEXT NOT NULL,
+                    PRIMARY KEY (employee_id, date)
+                );
+                CREATE TABLE IF NOT EXISTS trip_summary (
+                    kind TEXT NOT NULL, user_id TEXT NOT NULL, month TEXT NOT NULL,
+                    trips INTEGER NOT NULL, km REAL NOT NULL,
+                    PRIMARY KEY (kind, user_id, month)
+                );
+            ''' + TRIP_SUMMARY_TRIGGERS)
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'trip_summary_version'").fetchone() is None:
+                # 기존 DB 에 처음 적용할 때 1회 채움 (이후는 트리거가 갱신)
+                self._fill_trip_summary(conn)
+
+    def _fill_trip_summary(self, conn):
+        conn.execute('DELETE FROM trip_summary')
+        conn.execute(
+            f'INSERT INTO trip_summary (kind, user_id, month, trips, km) '
+            f'SELECT kind, user_id, substr(coalesce(trip_date, \'\'), 1, 7) AS m, count(*), sum({_km_sql("distance")}) '
+            f'FROM trips GROUP BY kind, user_id, m'
+        )
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('trip_summary_version', 0)")
+        self._bump(conn, 'trip_summary_version')
+
+    def _bump(self, conn, key):
+        conn.execute(
+            'INSERT INTO meta (key, value) VALUES (?, 1) ON CONFLICT(key) DO UPDATE SET value = value + 1',
+            (key,),
+        )
+
+    # --- data version (HTTP 캐시 검증용) ---
+
+    def data_version(self):
+        # 쓰기 트랜잭션마다 증가하는 meta 카운터 (출장은 트리거가 trip_summary_version 을 올림)
+        rows = dict(self._conn().execute(
+            "SELECT key, value FROM meta WHERE key IN ('users_version', 'trip_summary_version', 'attendance_version')"
+        ))
+        return {
+            'users': rows.get('users_version', 0),
+            'trips': rows.get('trip_summary_version', 0),
+            'attendance': rows.get('attendance_version', 0),
+        }
+
+    def data_modified(self):
+        # WAL 모드에서는 체크포인트 전까지 쓰기가 -wal 파일에만 반영됨
+        return _last_modified([self.path, f'{self.path}-wal'])
+
+    # --- users ---
+
+    def users_version(self):
+        row = self._conn().execute("SELECT value FROM meta WHERE key = 'users_version'").fetchone()
+        return row[0] if row else 0
+
+    def list_users(self):
+        cur = self._conn().execute(f'SELECT {", ".join(USER_FIELDS)} FROM users ORDER BY rowid')
+        return [list(row) for row in cur]
+
+    def upsert_user(self, row):
+        conn = self._conn()
+        updates = ', '.join(f'{f} = excluded.{f}' for f in USER_FIELDS[1:])
+        with conn:
+            conn.execute(
+                f'INSERT INTO users ({", ".join(USER_FIELDS)}) VALUES ({", ".join("?" * len(USER_FIELDS))}) '
+                f'ON CONFLICT(user_id) DO UPDATE SET {updates}',
+                list(row[:len(USER_FIELDS)]) + [''] * (len(USER_FIELDS) - len(row)),
+            )
+            self._bump(conn, 'users_version')
+
+    def delete_user(self, user_id):
+        conn = self._conn()
+        with conn:
+            conn.execute('DELETE FROM users WHERE user_id = ?', (user_id,))
+            self._bump(conn, 'users_version')
+
+    # --- trips ---
+
+    def add_trip(self, kind, row):
+        self.add_trips(kind, [row])
+
+    def add_trips(self, kind, rows):
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                f'INSERT INTO trips (kind, {", ".join(TRIP_FIELDS)}) VALUES (?, {", ".join("?" * len(TRIP_FIELDS))})',
+                [[kind] + (list(row) + [''] * len(TRIP_FIELDS))[:len(TRIP_FIELDS)] for row in rows],
+            )
+
+    def list_trips(self, kind, user_id=None, trip_date=None):
+        sql = f'SELECT {", ".join(TRIP_FIELDS)} FROM trips WHERE kind = ?'
+        params = [kind]
+        if user_id is not None:
+            sql += ' AND user_id = ?'
+            params.append(user_id)
+        if trip_date:
+            sql += ' AND trip_date = ?'
+            params.append(trip_date)
+        sql += ' ORDER BY id'
+        return [list(row) for row in self._conn().execute(sql, params)]
+
+    def page_trips(self, kind, user_id=None, start_date=None, end_date=None, cursor=None, limit=50):
+        sql = f'SELECT id, {", ".join(TRIP_FIELDS)} FROM trips WHERE kind = ?'
+        params = [kind]
+        if user_id is not None:
+            sql += ' AND user_id = ?'
+            params.append(user_id)
+        if start_date:
+            sql += ' AND trip_date >= ?'
+            params.append(start_date)
+        if end_date:
+            sql += ' AND trip_date <= ?'
+            params.append(end_date)
+        if cursor:
+            sql += ' AND (submit_time, user_id, id) < (?, ?, ?)'
+            params.extend(decode_cursor(cursor))
+        sql += ' ORDER BY submit_time DESC, user_id DESC, id DESC LIMIT ?'
+        params.append(limit + 1)
+        return _page([(row[0], list(row[1:])) for row in self._conn().execute(sql, params)], limit)
+
+    def delete_trip(self, kind, submit_time):
+        conn = self._conn()
+        with conn:
+            conn.execute('DELETE FROM trips WHERE kind = ? AND submit_time = ?', (kind, submit_time))
+
+    def find_trips(self, kind, user_id, submit_times):
+        submit_times = list(submit_times)
+        if not submit_times:
+            return []
+        sql = (
+            f'SELECT {", ".join(TRIP_FIELDS)} FROM trips WHERE kind = ? AND user_id = ? '
+            f'AND submit_time IN ({", ".join("?" * len(submit_times))}) ORDER BY id'
+        )
+        return [list(row) for row in self._conn().execute(sql, [kind, user_id] + submit_times)]
+
+    def set_trip_distance(self, kind, trip, distance):
+        return self.set_trip_distances(kind, [(trip, distance)])
+
+    def set_trip_distances(self, kind, updates):
+        conn = self._conn()
+        updated = 0
+        with conn:
+            for trip, distance in updates:
+                cur = conn.execute(
+                    'UPDATE trips SET distance = ? WHERE kind = ? AND user_id = ? AND submit_time = ? AND origin = ? AND destination = ?',
+                    (distance, kind, trip[0], trip[1], trip[4], trip[7]),
+                )
+                updated += cur.rowcount
+        return updated
+
+    # --- 월별 출장 합계 ---
+
+    def trip_summary_version(self):
+        row = self._conn().execute("SELECT value FROM meta WHERE key = 'trip_summary_version'").fetchone()
+        return row[0] if row else 0
+
+    def trip_summary(self):
+        cur = self._conn().execute('SELECT kind, user_id, month, trips, round(km, 2) FROM trip_summary WHERE trips != 0')
+        return [tuple(row) for row in cur]
+
+    def rebuild_trip_summary(self):
+        conn = self._conn()
+        with conn:
+            self._fill_trip_summary(conn)
+
+    # --- attendance / approvals ---
+
+    def list_attendance(self):
+        return list(self.iter_attendance())
+
+    def iter_attendance(self):
+        cols = ', '.join(ATTENDANCE_SQL_COLUMNS.values())
+        cur = self._conn().execute(f'SELECT {cols} FROM attendance ORDER BY id')
+        for row in cur:
+            yield dict(zip(ATTENDANCE_COLUMNS, ['' if v is None else v for v in row]))
+
+    def attendance_version(self):
+        row = self._conn().execute("SELECT value FROM meta WHERE key = 'attendance_version'").fetchone()
+        return row[0] if row else 0
+
+    def add_attendance(self, records):
+        # (사원번호, 날짜) 인덱스로 이미 있는 키는 건너뜀
+        cols = ', '.join(ATTENDANCE_SQL_COLUMNS.values())
+        rows = [[_cell(r.get(col)) for col in ATTENDANCE_COLUMNS] for r in records]
+        conn = self._conn()
+        before = conn.total_changes
+        with conn:
+            conn.executemany(
+                f'INSERT INTO attendance ({cols}) SELECT {", ".join("?" * len(ATTENDANCE_COLUMNS))} '
+                'WHERE NOT EXISTS (SELECT 1 FROM attendance WHERE employee_id = ? AND date = ?)',
+                [row + [row[0], row[5]] for row in rows],
+            )
+            self._bump(conn, 'attendance_version')
+        return conn.total_changes - before
+
+    def compact_attendance(self):
+        # 삭제가 즉시 반영되므로 별도 compaction 불필요
+        pass
+
+    def delete_attendance(self, employee_id, date):
+        conn = self._conn()
+        with conn:
+            conn.execute('DELETE FROM attendance WHERE employee_id = ? AND date = ?', (employee_id, date))
+            conn.execute('DELETE FROM approvals WHERE employee_id = ? AND date = ?', (employee_id, date))
+            self._bump(conn, 'attendance_version')
+
+    def load_approvals(self):
+        cur = self._conn().execute('SELECT employee_id, date, status FROM approvals')
+        return {(row[0], str(row[1])): row[2] for row in cur}
+
+    def add_approvals(self, rows):
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                'INSERT INTO approvals (employee_id, date, status) VALUES (?, ?, ?) '
+                'ON CONFLICT(employee_id, date) DO UPDATE SET status = excluded.status',
+                [tuple(row[:3]) for row in rows],
+            )
+            self._bump(conn, 'attendance_version')
+
+
+def open_storage(backend='csv', base_dir='.', sqlite_path='total.db', fsync=False):
+    if backend == 'sqlite':
+        return SqliteStorage(sqlite_path)
+    if backend == 'csv':
+        return CsvStorage(base_dir, fsync=fsync)
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def import_csv(source, target):
+    # CSV → SQLite 1회성 이관. 중복 사원번호는 첫 행만 유지
+    counts = {}
+    seen = set()
+    for row in source.list_users():
+        if row[0] not in seen:
+            seen.add(row[0])
+            target.upsert_user(row)
+    counts['users'] = len(seen)
+    for kind in TRIP_KINDS:
+        trips = source.list_trips(kind)
+        target.add_trips(kind, trips)
+        counts[f'{kind}_trips'] = len(trips)
+    attendance = source.list_attendance()
+    target.add_attendance(attendance)
+    counts['attendance'] = len(attendance)
+    approvals = source.load_approvals()
+    target.add_approvals([(emp, date, status) for (emp, date), status in approvals.items()])
+    counts['approvals'] = len(approvals)
+    return counts
@@ -0,0 +1,314 @@
+import csv
+import json
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime
+from datetime import time as dt_time
+
+from distance_jobs import DISTANCE_FAILED, distance_state, escape_formula
+from storage import DISTANCE_PATTERN, TRIP_FIELDS, TRIP_KINDS
+
+# 과거 시스템 내보내기 헤더 → TRIP_FIELDS (헤더가 없으면 TRIP_FIELDS 순서로 간주)
+HEADER_ALIASES = {
+    'user_id': 'user_id', '사원번호': 'user_id', '사번': 'user_id',
+    'submit_time': 'submit_time', '신청일시': 'submit_time', '등록일시': 'submit_time',
+    'trip_date': 'trip_date', '출장일': 'trip_date', '출장일자': 'trip_date', '날짜': 'trip_date',
+    'departure_time': 'departure_time', '출발시간': 'departure_time', '출발시각': 'departure_time',
+    'origin': 'origin', '출발지': 'origin',
+    'car_number': 'car_number', '차량번호': 'car_number',
+    'purpose': 'purpose', '목적': 'purpose', '출장목적': 'purpose',
+    'destination': 'destination', '도착지': 'destination', '목적지': 'destination',
+    'distance': 'distance', '거리': 'distance', '거리(km)': 'distance',
+    'kind': 'kind', '구분': 'kind',
+}
+KIND_ALIASES = {'local': 'local', '시내': 'local', 'outdoor': 'outdoor', '시외': 'outdoor'}
+DATE_FORMATS = ('%Y-%m-%d', '%Y.%m.%d', '%Y/%m/%d', '%Y%m%d')
+REQUIRED_FIELDS = ('user_id', 'trip_date', 'origin', 'destination')
+
+
+def read_rows(path):
+    # .xlsx 는 첫 시트, 그 외는 CSV (UTF-8, 실패 시 CP949) → 셀 값 목록 iterator
+    if path.lower().endswith('.xlsx'):
+        from openpyxl import load_workbook
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            for row in workbook.worksheets[0].iter_rows(values_only=True):
+                yield list(row)
+        finally:
+            workbook.close()
+        return
+    for encoding in ('utf-8-sig', 'cp949'):
+        try:
+            with open(path, 'r', newline='', encoding=encoding) as f:
+                rows = list(csv.reader(f))
+            break
+        except UnicodeDecodeError:
+            continue
+    else:
+        raise ValueError('파일 인코딩을 알 수 없습니다. (UTF-8 또는 CP949)')
+    yield from rows
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def _date(value):
+    if isinstance(value, (datetime, date)):
+        return value.strftime('%Y-%m-%d')
+    value = _text(value)[:10]
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+
+def _time(value):
+    if isinstance(value, (datetime, dt_time)):
+        return value.strftime('%H:%M')
+    value = _text(value)
+    for fmt in ('%H:%M', '%H:%M:%S', '%H%M'):
+        try:
+            return datetime.strptime(value, fmt).strftime('%H:%M')
+        except ValueError:
+            continue
+    return value
+
+
+def _datetime(value):
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return _text(value)
+
+
+def _distance(value):
+    # "12.3" / "12.3 km" / "12.3 km (추정)" → 저장 형식, 그 외는 None (다시 계산)
+    if isinstance(value, (int, float)):
+        return f'{float(value):.2f} km'
+    value = _text(value)
+    match = DISTANCE_PATTERN.match(value)
+    if match is None:
+        return None
+    # "12.3 (추정)" 처럼 km 없이 추정 표시만 있는 값도 저장 형식으로 맞춤
+    return f"{float(match.group(1)):.2f} km{' (추정)' if '추정' in value else ''}"
+
+
+def parse_trips(rows, kind=None):
+    # 행 목록 → ([(구분, 출장 행 TRIP_FIELDS 순서, 파일의 거리 또는 None)], [(행 번호, 오류)])
+    trips, errors = [], []
+    fields = list(TRIP_FIELDS)
+    for line, row in enumerate(rows, start=1):
+        if not row or all(_text(cell) == '' for cell in row):
+            continue
+        if line == 1:
+            header = [HEADER_ALIASES.get(_text(cell).lower()) for cell in row]
+            if sum(1 for name in header if name) >= len(REQUIRED_FIELDS):
+                fields = header
+                continue
+        values = dict(zip(fields, row))
+        values.pop(None, None)
+
+        row_kind = _text(values.get('kind')).lower()
+        trip_kind = KIND_ALIASES.get(row_kind) if row_kind else kind
+        if trip_kind not in TRIP_KINDS:
+            errors.append((line, '구분(시내/시외)이 없습니다. --kind 로 지정하세요.'))
+            continue
+        missing = [name for name in REQUIRED_FIELDS if not _text(values.get(name))]
+        if missing:
+            errors.append((line, f"필수 값 누락: {', '.join(missing)}"))
+            continue
+        trip_date = _date(values['trip_date'])
+        if trip_date is None:
+            errors.append((line, f"출장일 형식 오류: {_text(values['trip_date'])}"))
+            continue
+        # 신청일시가 없는 과거 자료는 빈 값으로 두고 저장 직전에 import_trips 가 고유한 값을 만듦
+        trips.append((trip_kind, [
+            _text(values['user_id']), _datetime(values.get('submit_time')), trip_date, _time(values.get('departure_time')),
+            _text(values['origin']), _text(values.get('car_number')), _text(values.get('purpose')),
+            _text(values['destination']), '',
+        ], _distance(values.get('distance'))))
+    return trips, errors
+
+
+class RateLimiter:
+    # 여러 스레드가 공유하는 초당 호출 수 제한 (rate <= 0 이면 제한 없음)
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(self._next, now) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class Checkpoint:
+    # 계산이 끝난 (출발지, 목적지) → 거리를 JSON Lines 로 한 줄씩 추가. 중단 후 다시 실행하면 이어서 계산
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self):
+        done = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        item = json.loads(line)
+                    except ValueError:
+                        # 중단 시점에 덜 쓰인 마지막 줄
+                        continue
+                    done[(item['origin'], item['destination'])] = item['distance']
+        except FileNotFoundError:
+            pass
+        return done
+
+    def add(self, pair, distance):
+        line = json.dumps({'origin': pair[0], 'destination': pair[1], 'distance': distance}, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def resolve_pairs(pairs, resolve, workers=8, rate=10.0, checkpoint=None, log=print, progress_seconds=5.0):
+    # 중복 제거된 (출발지, 목적지) 를 스레드 풀에서 resolve(출발지, 목적지) 로 계산 → {pair: 거리}
+    limiter = RateLimiter(rate)
+    results = {}
+    start = last_report = time.perf_counter()
+
+    def run(pair):
+        limiter.acquire()
+        try:
+            return resolve(*pair)
+        except Exception as e:
+            log(f"거리 계산 오류 {pair[0]} → {pair[1]}: {e}")
+            return DISTANCE_FAILED
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='trip-import')
+    try:
+        futures = {executor.submit(run, pair): pair for pair in pairs}
+        for future in as_completed(futures):
+            pair = futures[future]
+            distance = future.result()
+            results[pair] = distance
+            # 실패는 기록하지 않아 다시 실행할 때 재시도
+            if checkpoint is not None and distance_state(distance) == 'done':
+                checkpoint.add(pair, distance)
+            now = time.perf_counter()
+            if now - last_report >= progress_seconds:
+                last_report = now
+                log(f"pairs {len(results)}/{len(pairs)} ({len(results) / (now - start):.1f} pairs/sec)")
+    finally:
+        # Ctrl+C 등으로 중단되면 대기 중인 작업은 버리고 계산된 결과는 체크포인트에 남김
+        executor.shutdown(wait=True, cancel_futures=True)
+    return results
+
+
+def _stored(row, distance):
+    # [보안 4] CSV Injection 방지 (신청 화면과 같은 처리)
+    return row[:4] + [escape_formula(row[4])] + row[5:7] + [escape_formula(row[7]), distance]
+
+
+def _content(row):
+    # 신청일시/거리를 뺀 출장 내용 (저장된 행과 비교하므로 출발지/목적지는 저장 형식으로)
+    return (row[0], row[2], row[3], escape_formula(row[4]), row[5], row[6], escape_formula(row[7]))
+
+
+def _submit_time(row, used):
+    # 출장일 + 출발시간 + 내용 해시(마이크로초). 같은 날 같은 시각의 다른 출장/다른 사용자와 겹치지 않도록
+    # 이미 쓰인 값이면 1씩 증가 (삭제/페이지 이동이 신청일시로 행을 구분함)
+    base = f"{row[2]} {row[3] or '00:00'}:00"
+    fraction = zlib.crc32(repr(_content(row)).encode('utf-8')) % 1000000
+    while f'{base}.{fraction:06d}' in used:
+        fraction = (fraction + 1) % 1000000
+    return f'{base}.{fraction:06d}'
+
+
+def import_trips(storage, trips, resolve, workers=8, rate=10.0, checkpoint=None, reprice=False,
+                 batch_size=1000, dry_run=False, log=print):
+    # parse_trips 결과를 중복 제거 후 거리 계산해 구분별로 batch_size 행씩 저장 → 통계 dict.
+    # reprice 면 파일의 거리를 무시하고 다시 계산하며, 이미 저장된 행도 거리만 갱신
+    stats = {'rows': len(trips), 'duplicates': 0, 'pairs': 0, 'checkpointed': 0, 'resolved': 0, 'failed': 0, 'repriced': 0}
+    # 중복 판단은 행 내용 전체로: 신청일시가 있으면 신청일시 + 내용, 없으면 내용만
+    stored, used = {}, {}
+    for kind in TRIP_KINDS:
+        used[kind] = set()
+        for trip in storage.list_trips(kind):
+            stored[(kind,) + _content(trip) + (trip[1],)] = trip
+            stored.setdefault((kind,) + _content(trip), trip)
+            used[kind].add(trip[1])
+    seen = set()
+    pending, existing = [], []
+    for kind, row, distance in trips:
+        key = (kind,) + _content(row) + ((row[1],) if row[1] else ())
+        if key in seen:
+            stats['duplicates'] += 1
+            continue
+        seen.add(key)
+        if key in stored:
+            # 이미 가져온 행 (같은 파일 재실행 포함)
+            stats['duplicates'] += 1
+            if reprice:
+                existing.append((kind, stored[key], (row[4], row[7])))
+            continue
+        if not row[1]:
+            row[1] = _submit_time(row, used[kind])
+        used[kind].add(row[1])
+        pending.append((kind, row, None if reprice else distance))
+
+    pairs = sorted({(row[4], row[7]) for _, row, distance in pending if distance is None} | {pair for _, _, pair in existing})
+    done = checkpoint.load() if checkpoint is not None else {}
+    todo = [pair for pair in pairs if pair not in done]
+    stats.update(pairs=len(pairs), checkpointed=len(pairs) - len(todo))
+    log(f"trips {len(pending)} new / {stats['duplicates']} duplicate ({len(existing)} to reprice), "
+        f"distance pairs {len(pairs)} ({stats['checkpointed']} from checkpoint)")
+    if dry_run:
+        return stats
+
+    resolved = resolve_pairs(todo, resolve, workers=workers, rate=rate, checkpoint=checkpoint, log=log)
+    stats['resolved'] = len(resolved)
+    done.update(resolved)
+
+    written = {kind: 0 for kind in TRIP_KINDS}
+    for kind in TRIP_KINDS:
+        rows = []
+        for trip_kind, row, distance in pending:
+            if trip_kind != kind:
+                continue
+            distance = distance or done.get((row[4], row[7]), DISTANCE_FAILED)
+            if distance_state(distance) == 'failed':
+                stats['failed'] += 1
+            rows.append(_stored(row, distance))
+        for i in range(0, len(rows), batch_size):
+            storage.add_trips(kind, rows[i:i + batch_size])
+        written[kind] = len(rows)
+        # 실패한 계산으로 기존 거리를 덮어쓰지 않음
+        updates = [(trip, done[pair]) for trip_kind, trip, pair in existing
+                   if trip_kind == kind and distance_state(done.get(pair, DISTANCE_FAILED)) == 'done']
+        if updates:
+            stats['repriced'] += storage.set_trip_distances(kind, updates)
+    stats.update({f'{kind}_written': count for kind, count in written.items()})
+    if checkpoint is not None:
+        checkpoint.remove()
+    return stats
@@ -0,0 +1,75 @@
+import threading
+
+from storage import TRIP_KINDS
+
+
+class TripSummary:
+    # 저장소가 유지하는 (구분, 사원번호, 월) 합계에 사용자 부서/근무지를 붙여 월별 보고서로 집계.
+    # 저장소 합계 버전과 사용자 목록이 그대로면 이전 집계를 그대로 반환
+    def __init__(self, storage, user_directory):
+        self.storage = storage
+        self.user_directory = user_directory
+        self._lock = threading.Lock()
+        self._source = None
+        self._months = {}
+
+    def _current(self):
+        source = (self.storage.trip_summary_version(), self.user_directory.all())
+        if self._source is None or source[0] != self._source[0] or source[1] is not self._source[1]:
+            with self._lock:
+                self._months = self._build(self.storage.trip_summary())
+                self._source = source
+        return self._months
+
+    def _build(self, rows):
+        months = {}
+        for kind, user_id, month, trips, km in rows:
+            employees = months.setdefault(month, {})
+            employee = employees.get(user_id)
+            if employee is None:
+                user = self.user_directory.get(user_id)
+                employee = employees[user_id] = {
+                    'user_id': user_id,
+                    'username': user.username if user else user_id,
+                    'department': user.department if user else '미등록',
+                    'workplace': self.user_directory.workplace(user_id),
+                    'trips': 0,
+                    'km': 0.0,
+                }
+                for k in TRIP_KINDS:
+                    employee[f'{k}_trips'] = 0
+                    employee[f'{k}_km'] = 0.0
+            employee[f'{kind}_trips'] += trips
+            employee[f'{kind}_km'] += km
+            employee['trips'] += trips
+            employee['km'] += km
+
+        report = {}
+        for month, employees in months.items():
+            rows = sorted(employees.values(), key=lambda e: (-e['km'], e['user_id']))
+            report[month] = {
+                'employees': [self._rounded(row) for row in rows],
+                'departments': self._group(rows, 'department'),
+                'workplaces': self._group(rows, 'workplace'),
+            }
+        return report
+
+    @staticmethod
+    def _rounded(row):
+        return {k: round(v, 2) if isinstance(v, float) else v for k, v in row.items()}
+
+    def _group(self, rows, field):
+        groups = {}
+        for row in rows:
+            group = groups.setdefault(row[field], {field: row[field], 'employees': 0, 'trips': 0, 'km': 0.0})
+            group['employees'] += 1
+            group['trips'] += row['trips']
+            group['km'] += row['km']
+        return [self._rounded(group) for group in sorted(groups.values(), key=lambda g: -g['km'])]
+
+    def months(self):
+        return sorted((month for month in self._current() if month), reverse=True)
+
+    def report(self, month):
+        # {'employees': [...], 'departments': [...], 'workplaces': [...]} (해당 월 출장이 없으면 빈 목록)
+        return self._current().get(month, {'employees': [], 'departments': [], 'workplaces': []})
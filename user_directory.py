@@ -0,0 +1,75 @@
+import threading
+import time
+from collections import namedtuple
+
+WORKPLACES = ('논산', '대전', '수원')
+
+User = namedtuple('User', ['user_id', 'username', 'password', 'department', 'workplace', 'position', 'email', 'register_date'])
+
+
+def _to_user(row):
+    row = list(row[:len(User._fields)])
+    row += [''] * (len(User._fields) - len(row))
+    return User(*row)
+
+
+class UserDirectory:
+    # 사용자 목록을 워커당 한 번만 읽어 사원번호 → User 로 보관 (저장소 버전 변경 시 재적재)
+    def __init__(self, storage, check_interval=1.0):
+        self.storage = storage
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._users = []
+        self._index = {}
+        self._stamp = None
+        self._checked_at = 0.0
+        self._loaded = False
+
+    def _load(self, stamp):
+        users = []
+        index = {}
+        for row in self.storage.list_users():
+            user = _to_user(row)
+            users.append(user)
+            # 중복 ID 는 기존 동작과 같이 첫 번째 행 우선
+            index.setdefault(user.user_id, user)
+        self._users = users
+        self._index = index
+        self._stamp = stamp
+        self._loaded = True
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._loaded and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            stamp = self.storage.users_version()
+            if not self._loaded or stamp != self._stamp:
+                self._load(stamp)
+            self._checked_at = now
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+
+    def get(self, user_id):
+        self._refresh()
+        return self._index.get(user_id)
+
+    def all(self):
+        self._refresh()
+        return self._users
+
+    def username(self, user_id):
+        user = self.get(user_id)
+        return user.username if user else user_id
+
+    def department(self, user_id):
+        user = self.get(user_id)
+        return user.department if user else '미등록'
+
+    def workplace(self, user_id):
+        user = self.get(user_id)
+        if user is None:
+            return '논산'
+        return user.workplace if user.workplace in WORKPLACES else '논산'